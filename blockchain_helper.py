@@ -1,49 +1,199 @@
-from brownie import SimpleDeliveryTracker, accounts, network
+from brownie import SimpleDeliveryTracker, PackedDeliveryTracker, accounts, network, web3
 import time
 import os
 
+# Contract and address file for each storage layout
+LAYOUTS = {
+    'string': (SimpleDeliveryTracker, 'contract_address.txt'),
+    'packed': (PackedDeliveryTracker, 'packed_contract_address.txt')
+}
+
+# uint8 status codes used by PackedDeliveryTracker (0 = no delivery)
+STATUS_CODES = {'In Transit': 1, 'Delivered': 2, 'Delayed': 3, 'Preparing for Shipment': 4}
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+
 class BlockchainManager:
-    def __init__(self):
+    def __init__(self, layout=None):
         # Connect to persistent Ganache
         if not network.is_connected():
             network.connect('development')
         
+        # 'string' (SimpleDeliveryTracker) or 'packed' (PackedDeliveryTracker)
+        self.layout = layout or os.environ.get('DELIVERY_LAYOUT', 'string')
+        self.packed = self.layout == 'packed'
+        contract_type, address_file = LAYOUTS[self.layout]
+        self.address_file = address_file
+        
         # Load or deploy contract
-        if os.path.exists('contract_address.txt'):
-            with open('contract_address.txt', 'r') as f:
+        if os.path.exists(address_file):
+            with open(address_file, 'r') as f:
                 contract_address = f.read().strip()
-            self.contract = SimpleDeliveryTracker.at(contract_address)
+            self.contract = contract_type.at(contract_address)
         else:
             # Deploy new contract if address file doesn't exist
-            self.contract = SimpleDeliveryTracker.deploy({'from': accounts[0]})
-            with open('contract_address.txt', 'w') as f:
+            self.contract = contract_type.deploy({'from': accounts[0]})
+            with open(address_file, 'w') as f:
                 f.write(self.contract.address)
         
         self.account = accounts[0]
+        # Last block whose events have been applied (see commit_cursor)
+        self.last_block = web3.eth.block_number
+    
+    def _tx_params(self, tx_options=None):
+        """Build brownie transaction params, e.g. tx_options={'nonce': n, 'required_confs': 0}"""
+        params = {'from': self.account}
+        if tx_options:
+            params.update(tx_options)
+        return params
+    
+    def _id_arg(self, delivery_id):
+        """Delivery ID as the contract expects it (bytes32 for the packed layout)"""
+        if not self.packed:
+            return delivery_id
+        raw = delivery_id.encode('utf-8')
+        if len(raw) > 32:
+            raise ValueError(f"Delivery ID '{delivery_id}' is longer than 32 bytes")
+        return raw.ljust(32, b'\0')
+    
+    def _decode_id(self, value):
+        if not self.packed:
+            return value
+        raw = value if isinstance(value, bytes) else bytes.fromhex(str(value)[2:])
+        return raw.rstrip(b'\0').decode('utf-8')
+    
+    def _status_arg(self, status):
+        if not self.packed:
+            return status
+        if status not in STATUS_CODES:
+            raise ValueError(f"Unknown status '{status}'")
+        return STATUS_CODES[status]
+    
+    def _decode_status(self, value):
+        if not self.packed:
+            return value
+        return STATUS_NAMES.get(value, '')
+    
+    def get_pending_nonce(self):
+        """Next nonce for the sending account, counting pending transactions"""
+        return web3.eth.get_transaction_count(self.account.address, 'pending')
     
-    def add_delivery(self, delivery_id, origin_lat, origin_lon, dest_lat, dest_lon, status, current_lat, current_lon, expected_delivery_date=None):
+    def get_block_gas_limit(self):
+        """Gas limit of the latest block"""
+        return web3.eth.get_block('latest').gasLimit
+    
+    def add_delivery(self, delivery_id, origin_lat, origin_lon, dest_lat, dest_lon, status, current_lat, current_lon, expected_delivery_date=None, tx_options=None):
         """Add a new delivery to blockchain"""
         if expected_delivery_date is None:
             # Default: 3 days from now
             expected_delivery_date = int(time.time()) + (3 * 24 * 60 * 60)
         tx = self.contract.setDelivery(
-            delivery_id,
+            self._id_arg(delivery_id),
             int(origin_lat * 1_000_000),
             int(origin_lon * 1_000_000),
             int(dest_lat * 1_000_000),
             int(dest_lon * 1_000_000),
-            status,
+            self._status_arg(status),
             int(time.time()),
             int(current_lat * 1_000_000),
             int(current_lon * 1_000_000),
             expected_delivery_date,
-            {'from': self.account}
+            self._tx_params(tx_options)
         )
         return tx
     
+    def add_deliveries(self, deliveries, tx_options=None):
+        """Add many deliveries in one setDeliveries transaction
+        
+        Each delivery is a dict with the keys returned by get_delivery
+        (actual_delivery_date is not needed).
+        """
+        tx = self.contract.setDeliveries(self._encode_deliveries(deliveries), self._tx_params(tx_options))
+        return tx
+    
+    def estimate_add_deliveries_gas(self, deliveries):
+        """Estimate gas for add_deliveries without sending it"""
+        return self.contract.setDeliveries.estimate_gas(self._encode_deliveries(deliveries), {'from': self.account})
+    
+    def _encode_deliveries(self, deliveries):
+        """Convert delivery dicts into Delivery tuples for the contract"""
+        if self.packed:
+            return [(
+                self._id_arg(d['id']),
+                int(d['origin_lat'] * 1_000_000),
+                int(d['origin_lon'] * 1_000_000),
+                int(d['dest_lat'] * 1_000_000),
+                int(d['dest_lon'] * 1_000_000),
+                int(d['current_lat'] * 1_000_000),
+                int(d['current_lon'] * 1_000_000),
+                self._status_arg(d['status']),
+                int(d['timestamp']),
+                int(d['expected_delivery_date']),
+                0
+            ) for d in deliveries]
+        return [(
+            d['id'],
+            int(d['origin_lat'] * 1_000_000),
+            int(d['origin_lon'] * 1_000_000),
+            int(d['dest_lat'] * 1_000_000),
+            int(d['dest_lon'] * 1_000_000),
+            d['status'],
+            int(d['timestamp']),
+            int(d['current_lat'] * 1_000_000),
+            int(d['current_lon'] * 1_000_000),
+            int(d['expected_delivery_date']),
+            0
+        ) for d in deliveries]
+    
     def get_delivery(self, delivery_id):
         """Get delivery from blockchain"""
-        delivery = self.contract.getDelivery(delivery_id)
+        delivery = self.contract.getDelivery(self._id_arg(delivery_id))
+        return self._decode_delivery(delivery)
+    
+    def get_deliveries(self, delivery_ids, chunk_size=100):
+        """Get many deliveries with one eth_call per chunk_size IDs
+        
+        Results follow the order of delivery_ids; unknown IDs have an empty 'id'.
+        """
+        delivery_ids = list(delivery_ids)
+        deliveries = []
+        for start in range(0, len(delivery_ids), chunk_size):
+            chunk = [self._id_arg(d) for d in delivery_ids[start:start + chunk_size]]
+            for delivery in self.contract.getDeliveriesByIds(chunk):
+                deliveries.append(self._decode_delivery(delivery))
+        return deliveries
+    
+    def get_delivery_count(self):
+        """Get number of deliveries in the on-chain registry"""
+        return self.contract.getDeliveryCount()
+    
+    def iter_deliveries(self, page_size=100):
+        """Yield every registered delivery, fetching page_size structs per call"""
+        offset = 0
+        total = self.get_delivery_count()
+        while offset < total:
+            page = self.contract.getDeliveries(offset, page_size)
+            if not page:
+                break
+            for delivery in page:
+                yield self._decode_delivery(delivery)
+            offset += len(page)
+    
+    def _decode_delivery(self, delivery):
+        """Convert a raw Delivery tuple into a dict"""
+        if self.packed:
+            return {
+                'id': self._decode_id(delivery[0]),
+                'origin_lat': delivery[1] / 1_000_000,
+                'origin_lon': delivery[2] / 1_000_000,
+                'dest_lat': delivery[3] / 1_000_000,
+                'dest_lon': delivery[4] / 1_000_000,
+                'status': self._decode_status(delivery[7]),
+                'timestamp': delivery[8],
+                'current_lat': delivery[5] / 1_000_000,
+                'current_lon': delivery[6] / 1_000_000,
+                'expected_delivery_date': delivery[9],
+                'actual_delivery_date': delivery[10]
+            }
         return {
             'id': delivery[0],
             'origin_lat': delivery[1] / 1_000_000,
@@ -58,28 +208,28 @@ class BlockchainManager:
             'actual_delivery_date': delivery[10]
         }
     
-    def update_status(self, delivery_id, new_status, reason=""):
+    def update_status(self, delivery_id, new_status, reason="", tx_options=None):
         """Update delivery status"""
-        tx = self.contract.setStatus(delivery_id, new_status, reason, {'from': self.account})
+        tx = self.contract.setStatus(self._id_arg(delivery_id), self._status_arg(new_status), reason, self._tx_params(tx_options))
         return tx
     
-    def update_location(self, delivery_id, lat, lon):
+    def update_location(self, delivery_id, lat, lon, tx_options=None):
         """Update delivery location"""
         tx = self.contract.setLocation(
-            delivery_id,
+            self._id_arg(delivery_id),
             int(lat * 1_000_000),
             int(lon * 1_000_000),
-            {'from': self.account}
+            self._tx_params(tx_options)
         )
         return tx
     
     def get_status(self, delivery_id):
         """Get delivery status only"""
-        return self.contract.getStatus(delivery_id)
+        return self._decode_status(self.contract.getStatus(self._id_arg(delivery_id)))
     
     def get_location(self, delivery_id):
         """Get delivery location only"""
-        location = self.contract.getLocation(delivery_id)
+        location = self.contract.getLocation(self._id_arg(delivery_id))
         return {
             'lat': location[0] / 1_000_000,
             'lon': location[1] / 1_000_000
@@ -87,10 +237,87 @@ class BlockchainManager:
     
     def get_status_history(self, delivery_id):
         """Get status update history"""
-        history = self.contract.getStatusHistory(delivery_id)
-        return [{'status': h[0], 'timestamp': h[1], 'reason': h[2]} for h in history]
+        history = self.contract.getStatusHistory(self._id_arg(delivery_id))
+        return [{'status': self._decode_status(h[0]), 'timestamp': h[1], 'reason': h[2]} for h in history]
     
     def get_location_history(self, delivery_id):
         """Get location update history"""
-        history = self.contract.getLocationHistory(delivery_id)
+        history = self.contract.getLocationHistory(self._id_arg(delivery_id))
+        return [{'lat': h[0] / 1_000_000, 'lon': h[1] / 1_000_000, 'timestamp': h[2]} for h in history]
+    
+    def get_status_history_count(self, delivery_id):
+        """Get number of status updates"""
+        return self.contract.getStatusHistoryCount(self._id_arg(delivery_id))
+    
+    def get_location_history_count(self, delivery_id):
+        """Get number of location updates"""
+        return self.contract.getLocationHistoryCount(self._id_arg(delivery_id))
+    
+    def get_status_history_range(self, delivery_id, start, count):
+        """Get up to count status updates starting at index start (oldest first)"""
+        history = self.contract.getStatusHistoryRange(self._id_arg(delivery_id), start, count)
+        return [{'status': self._decode_status(h[0]), 'timestamp': h[1], 'reason': h[2]} for h in history]
+    
+    def get_location_history_range(self, delivery_id, start, count):
+        """Get up to count location updates starting at index start (oldest first)"""
+        history = self.contract.getLocationHistoryRange(self._id_arg(delivery_id), start, count)
         return [{'lat': h[0] / 1_000_000, 'lon': h[1] / 1_000_000, 'timestamp': h[2]} for h in history]
+    
+    def get_events(self, from_block, to_block=None):
+        """Get delivery events between two blocks (inclusive), oldest first
+        
+        Returns (events, to_block) where each event is a dict with 'event',
+        'id', 'block' and the event's own fields.
+        """
+        if to_block is None:
+            to_block = web3.eth.block_number
+        if from_block > to_block:
+            return [], to_block
+        
+        sequence = self.contract.events.get_sequence(from_block, to_block)
+        events = []
+        for name in ('DeliveryCreated', 'StatusChanged', 'LocationChanged'):
+            for log in sequence.get(name, []):
+                args = log['args']
+                event = {
+                    'event': name,
+                    'id': self._decode_id(args['deliveryId']),
+                    'block': log['blockNumber'],
+                    'log_index': log['logIndex'],
+                    'timestamp': args['timestamp']
+                }
+                if name == 'DeliveryCreated':
+                    event['status'] = self._decode_status(args['status'])
+                elif name == 'StatusChanged':
+                    event['status'] = self._decode_status(args['status'])
+                    event['reason'] = args['reason']
+                else:
+                    event['lat'] = args['lat'] / 1_000_000
+                    event['lon'] = args['lon'] / 1_000_000
+                events.append(event)
+        events.sort(key=lambda e: (e['block'], e['log_index']))
+        return events, to_block
+    
+    def poll_changes(self):
+        """Get delivery events emitted since the last committed block
+        
+        Returns (events, to_block). The cursor does not move until the caller
+        has applied the batch and calls commit_cursor(to_block), so a failed
+        read or write polls the same range again.
+        """
+        return self.get_events(self.last_block + 1)
+    
+    def commit_cursor(self, to_block):
+        """Mark every block up to to_block as applied"""
+        self.last_block = max(self.last_block, to_block)
+    
+    def poll_changed_deliveries(self):
+        """Poll events and read the current state of every delivery they touch
+        
+        Returns (events, deliveries, to_block); see poll_changes.
+        """
+        events, to_block = self.poll_changes()
+        if not events:
+            return events, [], to_block
+        changed_ids = list(dict.fromkeys(e['id'] for e in events))
+        return events, [d for d in self.get_deliveries(changed_ids) if d['id']], to_block
@@ -0,0 +1,89 @@
+using JSON
+using Mmap
+
+# Columnar training-data store shared by generate_training_data.jl and
+# train_model.jl (training_store.py reads and writes the same layout):
+#
+#   <dir>/manifest.json                 columns, dtypes and chunk list
+#   <dir>/chunk-00000/<column>.bin      raw little-endian values, one file per column
+#
+# Chunks are appended, so a store can grow without rewriting earlier data.
+
+const COLUMNS = [
+    ("total_distance", Float32),
+    ("remaining_distance", Float32),
+    ("percent_complete", Float32),
+    ("elapsed_days", Float32),
+    ("expected_days", Float32),
+    ("time_until_expected", Int32),
+    ("weather_risk", Int8),
+    ("traffic_risk", Int8),
+    ("is_delayed", Int8),
+    ("delay_score", Float32)
+]
+
+const DTYPES = Dict("float32" => Float32, "int32" => Int32, "int8" => Int8)
+
+dtype_name(T) = lowercase(string(T))
+
+function new_manifest()
+    return Dict(
+        "format" => "columnar",
+        "version" => 1,
+        "byte_order" => "little",
+        "columns" => [Dict("name" => name, "dtype" => dtype_name(T)) for (name, T) in COLUMNS],
+        "chunks" => [],
+        "rows" => 0
+    )
+end
+
+read_manifest(dir) = JSON.parsefile(joinpath(dir, "manifest.json"))
+
+function write_manifest(dir, manifest)
+    path = joinpath(dir, "manifest.json")
+    open(path * ".tmp", "w") do f
+        JSON.print(f, manifest, 2)
+    end
+    mv(path * ".tmp", path; force=true)
+end
+
+# Append one chunk; columns maps every column name to a vector of equal length
+function append_chunk!(dir, columns)
+    mkpath(dir)
+    manifest = isfile(joinpath(dir, "manifest.json")) ? read_manifest(dir) : new_manifest()
+    rows = length(columns[manifest["columns"][1]["name"]])
+    rows == 0 && return manifest
+
+    chunk = "chunk-$(lpad(length(manifest["chunks"]), 5, '0'))"
+    mkpath(joinpath(dir, chunk))
+    for column in manifest["columns"]
+        values = convert(Vector{DTYPES[column["dtype"]]}, columns[column["name"]])
+        length(values) == rows || error("column $(column["name"]) has $(length(values)) rows, expected $rows")
+        open(joinpath(dir, chunk, column["name"] * ".bin"), "w") do f
+            write(f, htol.(values))
+        end
+    end
+
+    # The manifest is written last, so readers never see a partial chunk
+    push!(manifest["chunks"], Dict("path" => chunk, "rows" => rows))
+    manifest["rows"] += rows
+    write_manifest(dir, manifest)
+    return manifest
+end
+
+# Call f(columns) for each chunk, with columns mapping name => memory-mapped vector
+function foreach_columnar_chunk(f, dir; names=nothing)
+    ENDIAN_BOM == 0x04030201 || error("columnar training data is little-endian")
+    manifest = read_manifest(dir)
+    for chunk in manifest["chunks"]
+        columns = Dict{String,Any}()
+        for column in manifest["columns"]
+            names === nothing || column["name"] in names || continue
+            path = joinpath(dir, chunk["path"], column["name"] * ".bin")
+            columns[column["name"]] = open(path) do f
+                Mmap.mmap(f, Vector{DTYPES[column["dtype"]]}, chunk["rows"])
+            end
+        end
+        f(columns)
+    end
+end
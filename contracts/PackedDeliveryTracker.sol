@@ -0,0 +1,198 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+// Same features as SimpleDeliveryTracker with a compact storage layout:
+// IDs are bytes32, coordinates int32 micro-degrees, timestamps uint40 and
+// status a uint8 code, so each delivery fits in three storage slots.
+contract PackedDeliveryTracker {
+    // Status codes (0 means the delivery does not exist)
+    uint8 constant STATUS_IN_TRANSIT = 1;
+    uint8 constant STATUS_DELIVERED = 2;
+    uint8 constant STATUS_DELAYED = 3;
+    uint8 constant STATUS_PREPARING = 4;
+
+    struct Delivery {
+        bytes32 deliveryId;
+        int32 originLat;
+        int32 originLon;
+        int32 destLat;
+        int32 destLon;
+        int32 currentLat;
+        int32 currentLon;
+        uint8 status;
+        uint40 timestamp;
+        uint40 expectedDeliveryDate;
+        uint40 actualDeliveryDate;
+    }
+
+    struct StatusUpdate {
+        uint8 status;
+        uint40 timestamp;
+        string reason;
+    }
+
+    struct LocationUpdate {
+        int32 lat;
+        int32 lon;
+        uint40 timestamp;
+    }
+
+    mapping(bytes32 => Delivery) public deliveries;
+    mapping(bytes32 => StatusUpdate[]) public statusHistory;
+    mapping(bytes32 => LocationUpdate[]) public locationHistory;
+
+    event DeliveryCreated(bytes32 deliveryId, uint8 status, uint40 timestamp);
+    event StatusChanged(bytes32 deliveryId, uint8 status, string reason, uint40 timestamp);
+    event LocationChanged(bytes32 deliveryId, int32 lat, int32 lon, uint40 timestamp);
+
+    // Registry of every delivery ID ever set, in insertion order
+    bytes32[] public deliveryIds;
+
+    // Add or update complete delivery
+    function setDelivery(
+        bytes32 _id,
+        int32 _originLat,
+        int32 _originLon,
+        int32 _destLat,
+        int32 _destLon,
+        uint8 _status,
+        uint40 _timestamp,
+        int32 _currentLat,
+        int32 _currentLon,
+        uint40 _expectedDeliveryDate
+    ) public {
+        _storeDelivery(Delivery(_id, _originLat, _originLon, _destLat, _destLon, _currentLat, _currentLon, _status, _timestamp, _expectedDeliveryDate, 0));
+    }
+
+    // Add or update many deliveries in one transaction (actualDeliveryDate is ignored)
+    function setDeliveries(Delivery[] memory _deliveries) public {
+        for (uint256 i = 0; i < _deliveries.length; i++) {
+            _storeDelivery(_deliveries[i]);
+        }
+    }
+
+    function _storeDelivery(Delivery memory _delivery) internal {
+        bytes32 id = _delivery.deliveryId;
+        require(id != bytes32(0), "empty delivery id");
+        if (deliveries[id].deliveryId == bytes32(0)) {
+            deliveryIds.push(id);
+        }
+        _delivery.actualDeliveryDate = 0;
+        deliveries[id] = _delivery;
+        emit DeliveryCreated(id, _delivery.status, _delivery.timestamp);
+    }
+
+    // Get complete delivery
+    function getDelivery(bytes32 _id) public view returns (Delivery memory) {
+        return deliveries[_id];
+    }
+
+    // Number of registered deliveries
+    function getDeliveryCount() public view returns (uint256) {
+        return deliveryIds.length;
+    }
+
+    // Get up to _limit deliveries starting at registry position _offset
+    function getDeliveries(uint256 _offset, uint256 _limit) public view returns (Delivery[] memory) {
+        uint256 total = deliveryIds.length;
+        if (_offset >= total) {
+            return new Delivery[](0);
+        }
+        // Clamped without computing _offset + _limit, which would overflow for a huge _limit
+        uint256 end = _limit > total - _offset ? total : _offset + _limit;
+        Delivery[] memory page = new Delivery[](end - _offset);
+        for (uint256 i = _offset; i < end; i++) {
+            page[i - _offset] = deliveries[deliveryIds[i]];
+        }
+        return page;
+    }
+
+    // Get many deliveries by ID in one call; unknown IDs come back empty
+    function getDeliveriesByIds(bytes32[] memory _ids) public view returns (Delivery[] memory) {
+        Delivery[] memory result = new Delivery[](_ids.length);
+        for (uint256 i = 0; i < _ids.length; i++) {
+            result[i] = deliveries[_ids[i]];
+        }
+        return result;
+    }
+
+    // Set status only
+    function setStatus(bytes32 _id, uint8 _status, string memory _reason) public {
+        Delivery storage d = deliveries[_id];
+        d.status = _status;
+        // Auto-set actual delivery date when marked as delivered
+        if (_status == STATUS_DELIVERED && d.actualDeliveryDate == 0) {
+            d.actualDeliveryDate = uint40(block.timestamp);
+        }
+        // Add to history
+        statusHistory[_id].push(StatusUpdate(_status, uint40(block.timestamp), _reason));
+        emit StatusChanged(_id, _status, _reason, uint40(block.timestamp));
+    }
+
+    // Get status only
+    function getStatus(bytes32 _id) public view returns (uint8) {
+        return deliveries[_id].status;
+    }
+
+    // Set current location only
+    function setLocation(bytes32 _id, int32 _lat, int32 _lon) public {
+        Delivery storage d = deliveries[_id];
+        d.currentLat = _lat;
+        d.currentLon = _lon;
+        // Add to history
+        locationHistory[_id].push(LocationUpdate(_lat, _lon, uint40(block.timestamp)));
+        emit LocationChanged(_id, _lat, _lon, uint40(block.timestamp));
+    }
+
+    // Get current location only
+    function getLocation(bytes32 _id) public view returns (int32, int32) {
+        return (deliveries[_id].currentLat, deliveries[_id].currentLon);
+    }
+
+    // Get status history
+    function getStatusHistory(bytes32 _id) public view returns (StatusUpdate[] memory) {
+        return statusHistory[_id];
+    }
+
+    // Get location history
+    function getLocationHistory(bytes32 _id) public view returns (LocationUpdate[] memory) {
+        return locationHistory[_id];
+    }
+
+    // Get history counts
+    function getStatusHistoryCount(bytes32 _id) public view returns (uint256) {
+        return statusHistory[_id].length;
+    }
+
+    function getLocationHistoryCount(bytes32 _id) public view returns (uint256) {
+        return locationHistory[_id].length;
+    }
+
+    // Get up to _count status updates starting at index _start
+    function getStatusHistoryRange(bytes32 _id, uint256 _start, uint256 _count) public view returns (StatusUpdate[] memory) {
+        StatusUpdate[] storage history = statusHistory[_id];
+        if (_start >= history.length) {
+            return new StatusUpdate[](0);
+        }
+        uint256 end = _count > history.length - _start ? history.length : _start + _count;
+        StatusUpdate[] memory page = new StatusUpdate[](end - _start);
+        for (uint256 i = _start; i < end; i++) {
+            page[i - _start] = history[i];
+        }
+        return page;
+    }
+
+    // Get up to _count location updates starting at index _start
+    function getLocationHistoryRange(bytes32 _id, uint256 _start, uint256 _count) public view returns (LocationUpdate[] memory) {
+        LocationUpdate[] storage history = locationHistory[_id];
+        if (_start >= history.length) {
+            return new LocationUpdate[](0);
+        }
+        uint256 end = _count > history.length - _start ? history.length : _start + _count;
+        LocationUpdate[] memory page = new LocationUpdate[](end - _start);
+        for (uint256 i = _start; i < end; i++) {
+            page[i - _start] = history[i];
+        }
+        return page;
+    }
+}
@@ -32,6 +32,14 @@ contract SimpleDeliveryTracker {
     mapping(string => StatusUpdate[]) public statusHistory;
     mapping(string => LocationUpdate[]) public locationHistory;
     
+    event DeliveryCreated(string deliveryId, string status, uint256 timestamp);
+    event StatusChanged(string deliveryId, string status, string reason, uint256 timestamp);
+    event LocationChanged(string deliveryId, int256 lat, int256 lon, uint256 timestamp);
+    
+    // Registry of every delivery ID ever set, in insertion order
+    string[] public deliveryIds;
+    mapping(string => bool) public deliveryExists;
+    
     // Add or update complete delivery
     function setDelivery(
         string memory _id,
@@ -45,7 +53,25 @@ contract SimpleDeliveryTracker {
         int256 _currentLon,
         uint256 _expectedDeliveryDate
     ) public {
-        deliveries[_id] = Delivery(_id, _originLat, _originLon, _destLat, _destLon, _status, _timestamp, _currentLat, _currentLon, _expectedDeliveryDate, 0);
+        _storeDelivery(Delivery(_id, _originLat, _originLon, _destLat, _destLon, _status, _timestamp, _currentLat, _currentLon, _expectedDeliveryDate, 0));
+    }
+    
+    // Add or update many deliveries in one transaction (actualDeliveryDate is ignored)
+    function setDeliveries(Delivery[] memory _deliveries) public {
+        for (uint256 i = 0; i < _deliveries.length; i++) {
+            _storeDelivery(_deliveries[i]);
+        }
+    }
+    
+    function _storeDelivery(Delivery memory _delivery) internal {
+        string memory id = _delivery.deliveryId;
+        if (!deliveryExists[id]) {
+            deliveryExists[id] = true;
+            deliveryIds.push(id);
+        }
+        _delivery.actualDeliveryDate = 0;
+        deliveries[id] = _delivery;
+        emit DeliveryCreated(id, _delivery.status, _delivery.timestamp);
     }
     
     // Get complete delivery
@@ -66,6 +92,35 @@ contract SimpleDeliveryTracker {
         return (d.deliveryId, d.originLat, d.originLon, d.destLat, d.destLon, d.status, d.timestamp, d.currentLat, d.currentLon, d.expectedDeliveryDate, d.actualDeliveryDate);
     }
     
+    // Number of registered deliveries
+    function getDeliveryCount() public view returns (uint256) {
+        return deliveryIds.length;
+    }
+    
+    // Get up to _limit deliveries starting at registry position _offset
+    function getDeliveries(uint256 _offset, uint256 _limit) public view returns (Delivery[] memory) {
+        uint256 total = deliveryIds.length;
+        if (_offset >= total) {
+            return new Delivery[](0);
+        }
+        // Clamped without computing _offset + _limit, which would overflow for a huge _limit
+        uint256 end = _limit > total - _offset ? total : _offset + _limit;
+        Delivery[] memory page = new Delivery[](end - _offset);
+        for (uint256 i = _offset; i < end; i++) {
+            page[i - _offset] = deliveries[deliveryIds[i]];
+        }
+        return page;
+    }
+    
+    // Get many deliveries by ID in one call; unknown IDs come back empty
+    function getDeliveriesByIds(string[] memory _ids) public view returns (Delivery[] memory) {
+        Delivery[] memory result = new Delivery[](_ids.length);
+        for (uint256 i = 0; i < _ids.length; i++) {
+            result[i] = deliveries[_ids[i]];
+        }
+        return result;
+    }
+    
     // Set status only
     function setStatus(string memory _id, string memory _status, string memory _reason) public {
         deliveries[_id].status = _status;
@@ -75,6 +130,7 @@ contract SimpleDeliveryTracker {
         }
         // Add to history
         statusHistory[_id].push(StatusUpdate(_status, block.timestamp, _reason));
+        emit StatusChanged(_id, _status, _reason, block.timestamp);
     }
     
     // Get status only
@@ -88,6 +144,7 @@ contract SimpleDeliveryTracker {
         deliveries[_id].currentLon = _lon;
         // Add to history
         locationHistory[_id].push(LocationUpdate(_lat, _lon, block.timestamp));
+        emit LocationChanged(_id, _lat, _lon, block.timestamp);
     }
     
     // Get current location only
@@ -113,4 +170,32 @@ contract SimpleDeliveryTracker {
     function getLocationHistoryCount(string memory _id) public view returns (uint256) {
         return locationHistory[_id].length;
     }
+    
+    // Get up to _count status updates starting at index _start
+    function getStatusHistoryRange(string memory _id, uint256 _start, uint256 _count) public view returns (StatusUpdate[] memory) {
+        StatusUpdate[] storage history = statusHistory[_id];
+        if (_start >= history.length) {
+            return new StatusUpdate[](0);
+        }
+        uint256 end = _count > history.length - _start ? history.length : _start + _count;
+        StatusUpdate[] memory page = new StatusUpdate[](end - _start);
+        for (uint256 i = _start; i < end; i++) {
+            page[i - _start] = history[i];
+        }
+        return page;
+    }
+    
+    // Get up to _count location updates starting at index _start
+    function getLocationHistoryRange(string memory _id, uint256 _start, uint256 _count) public view returns (LocationUpdate[] memory) {
+        LocationUpdate[] storage history = locationHistory[_id];
+        if (_start >= history.length) {
+            return new LocationUpdate[](0);
+        }
+        uint256 end = _count > history.length - _start ? history.length : _start + _count;
+        LocationUpdate[] memory page = new LocationUpdate[](end - _start);
+        for (uint256 i = _start; i < end; i++) {
+            page[i - _start] = history[i];
+        }
+        return page;
+    }
 }
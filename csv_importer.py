@@ -0,0 +1,151 @@
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+VALID_STATUSES = ['In Transit', 'Delivered', 'Delayed', 'Preparing for Shipment']
+DEFAULT_TRANSIT_SECONDS = 3 * 24 * 60 * 60
+
+# Share of the block gas limit a single batch may use
+GAS_HEADROOM = 0.8
+
+
+def parse_row(row):
+    """Validate one CSV row and convert it into a delivery dict
+
+    Raises ValueError for missing or out-of-range fields.
+    """
+    delivery_id = (row.get('Delivery_ID') or '').strip()
+    if not delivery_id:
+        raise ValueError("missing Delivery_ID")
+
+    # Accept case variations such as 'In transit'
+    status = (row.get('Status') or '').strip()
+    canonical = {s.lower(): s for s in VALID_STATUSES}
+    if status.lower() not in canonical:
+        raise ValueError(f"unknown status '{status}'")
+    status = canonical[status.lower()]
+
+    coords = {}
+    for key, column, limit in [
+        ('origin_lat', 'Origin_Latitude', 90), ('origin_lon', 'Origin_Longitude', 180),
+        ('dest_lat', 'Destination_Latitude', 90), ('dest_lon', 'Destination_Longitude', 180),
+        ('current_lat', 'Current_Latitude', 90), ('current_lon', 'Current_Longitude', 180)
+    ]:
+        value = float(row[column])
+        if not -limit <= value <= limit:
+            raise ValueError(f"{column} out of range: {value}")
+        coords[key] = value
+
+    timestamp = int(datetime.fromisoformat(row['Timestamp'].strip()).timestamp())
+    expected = row.get('Expected_Delivery_Date')
+    if expected:
+        expected_delivery_date = int(datetime.fromisoformat(expected.strip()).timestamp())
+    else:
+        expected_delivery_date = timestamp + DEFAULT_TRANSIT_SECONDS
+
+    return {
+        'id': delivery_id,
+        'status': status,
+        'timestamp': timestamp,
+        'expected_delivery_date': expected_delivery_date,
+        **coords
+    }
+
+
+def iter_rows(csv_path, skip=0, errors=None):
+    """Stream (row_number, delivery) pairs, skipping the first skip data rows
+
+    Invalid rows are reported as (row_number, message) in errors and skipped.
+    """
+    with open(csv_path, newline='') as f:
+        for row_number, row in enumerate(csv.DictReader(f), start=1):
+            if row_number <= skip:
+                continue
+            try:
+                yield row_number, parse_row(row)
+            except (ValueError, KeyError, TypeError) as e:
+                if errors is not None:
+                    errors.append((row_number, str(e)))
+
+
+def load_checkpoint(checkpoint_path, csv_path):
+    """Number of data rows already committed for csv_path"""
+    try:
+        with open(checkpoint_path, 'r') as f:
+            checkpoint = json.load(f)
+    except (OSError, ValueError):
+        return 0
+    if checkpoint.get('csv_path') != os.path.abspath(csv_path):
+        return 0
+    return checkpoint.get('rows_committed', 0)
+
+
+def save_checkpoint(checkpoint_path, csv_path, rows_committed):
+    tmp_path = checkpoint_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'csv_path': os.path.abspath(csv_path), 'rows_committed': rows_committed}, f)
+    os.replace(tmp_path, checkpoint_path)
+
+
+def import_csv(bc, csv_path, gas_limit=None, max_batch=200, checkpoint_path=None, resume=True, log=print):
+    """Import a delivery CSV through setDeliveries in gas-bounded batches
+
+    Batches are sized against gas_limit, by default the chain's latest block
+    gas limit. Progress is checkpointed after every committed batch, so a rerun with
+    resume=True continues after the last batch that made it on chain.
+    Returns (deliveries_imported, errors).
+    """
+    if checkpoint_path is None:
+        checkpoint_path = csv_path + '.progress.json'
+    rows_committed = load_checkpoint(checkpoint_path, csv_path) if resume else 0
+    if rows_committed:
+        log(f"Resuming after row {rows_committed}")
+
+    if gas_limit is None:
+        gas_limit = bc.get_block_gas_limit()
+    budget = int(gas_limit * GAS_HEADROOM)
+    errors = []
+    rows = iter_rows(csv_path, skip=rows_committed, errors=errors)
+    pending = []
+    rows_per_batch = min(50, max_batch)
+    imported = 0
+    start = time.time()
+
+    while True:
+        while len(pending) < rows_per_batch:
+            row = next(rows, None)
+            if row is None:
+                break
+            pending.append(row)
+        if not pending:
+            break
+
+        batch = pending[:rows_per_batch]
+        deliveries = [delivery for _, delivery in batch]
+        gas = bc.estimate_add_deliveries_gas(deliveries)
+        if gas > budget and len(batch) > 1:
+            # Too big for one block, shrink and retry the same rows
+            rows_per_batch = max(1, len(batch) * budget // gas)
+            continue
+
+        bc.add_deliveries(deliveries)
+        pending = pending[len(batch):]
+        imported += len(batch)
+        rows_committed = batch[-1][0]
+        save_checkpoint(checkpoint_path, csv_path, rows_committed)
+
+        # Size the next batch from the measured gas per row
+        rows_per_batch = max(1, min(max_batch, int(budget * len(batch) // max(gas, 1))))
+
+        elapsed = time.time() - start
+        rate = imported / elapsed if elapsed > 0 else 0
+        log(f"Committed {imported} deliveries up to row {rows_committed} ({rate:.1f} rows/s)")
+
+    elapsed = time.time() - start
+    rate = imported / elapsed if elapsed > 0 else 0
+    log(f"Imported {imported} deliveries in {elapsed:.1f}s ({rate:.1f} rows/s), {len(errors)} invalid rows skipped")
+    for row_number, message in errors[:20]:
+        log(f"  Row {row_number}: {message}")
+    return imported, errors
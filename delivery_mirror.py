@@ -0,0 +1,108 @@
+import sqlite3
+
+DELIVERY_COLUMNS = [
+    'id', 'origin_lat', 'origin_lon', 'dest_lat', 'dest_lon', 'status', 'timestamp',
+    'current_lat', 'current_lon', 'expected_delivery_date', 'actual_delivery_date'
+]
+
+
+class DeliveryMirror:
+    """SQLite copy of contract state, consistent as of a stored block number"""
+
+    def __init__(self, path='delivery_mirror.db'):
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE TABLE IF NOT EXISTS deliveries (
+                id TEXT PRIMARY KEY,
+                origin_lat REAL, origin_lon REAL,
+                dest_lat REAL, dest_lon REAL,
+                status TEXT,
+                timestamp INTEGER,
+                current_lat REAL, current_lon REAL,
+                expected_delivery_date INTEGER,
+                actual_delivery_date INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS status_history (
+                delivery_id TEXT, status TEXT, timestamp INTEGER, reason TEXT, block INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS location_history (
+                delivery_id TEXT, lat REAL, lon REAL, timestamp INTEGER, block INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_status_history ON status_history (delivery_id);
+            CREATE INDEX IF NOT EXISTS idx_location_history ON location_history (delivery_id);
+        ''')
+
+    def _get_meta(self, key):
+        row = self.conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
+
+    @property
+    def block(self):
+        """Block the mirror is consistent at, or None if it was never filled"""
+        value = self._get_meta('block')
+        return int(value) if value is not None else None
+
+    @property
+    def contract_address(self):
+        return self._get_meta('contract_address')
+
+    def reset(self, contract_address):
+        """Drop all mirrored state and start over for a (new) contract"""
+        with self.conn:
+            self.conn.execute('DELETE FROM deliveries')
+            self.conn.execute('DELETE FROM status_history')
+            self.conn.execute('DELETE FROM location_history')
+            self.conn.execute('DELETE FROM meta')
+            if contract_address is not None:
+                self._set_meta('contract_address', contract_address)
+
+    def load_deliveries(self):
+        """Get every mirrored delivery as a dict"""
+        cursor = self.conn.execute(f'SELECT {", ".join(DELIVERY_COLUMNS)} FROM deliveries')
+        return [dict(zip(DELIVERY_COLUMNS, row)) for row in cursor]
+
+    def apply(self, deliveries, events, block):
+        """Store changed deliveries and history from events, then advance to block"""
+        placeholders = ', '.join('?' for _ in DELIVERY_COLUMNS)
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT OR REPLACE INTO deliveries ({", ".join(DELIVERY_COLUMNS)}) VALUES ({placeholders})',
+                [tuple(d[c] for c in DELIVERY_COLUMNS) for d in deliveries]
+            )
+            self.conn.executemany(
+                'INSERT INTO status_history (delivery_id, status, timestamp, reason, block) VALUES (?, ?, ?, ?, ?)',
+                [(e['id'], e['status'], e['timestamp'], e['reason'], e['block'])
+                 for e in events if e['event'] == 'StatusChanged']
+            )
+            self.conn.executemany(
+                'INSERT INTO location_history (delivery_id, lat, lon, timestamp, block) VALUES (?, ?, ?, ?, ?)',
+                [(e['id'], e['lat'], e['lon'], e['timestamp'], e['block'])
+                 for e in events if e['event'] == 'LocationChanged']
+            )
+            self._set_meta('block', block)
+
+    def get_status_history(self, delivery_id):
+        """Get mirrored status history, oldest first"""
+        cursor = self.conn.execute(
+            'SELECT status, timestamp, reason FROM status_history WHERE delivery_id = ? ORDER BY block, rowid',
+            (delivery_id,)
+        )
+        return [{'status': r[0], 'timestamp': r[1], 'reason': r[2]} for r in cursor]
+
+    def get_location_history(self, delivery_id):
+        """Get mirrored location history, oldest first"""
+        cursor = self.conn.execute(
+            'SELECT lat, lon, timestamp FROM location_history WHERE delivery_id = ? ORDER BY block, rowid',
+            (delivery_id,)
+        )
+        return [{'lat': r[0], 'lon': r[1], 'timestamp': r[2]} for r in cursor]
+
+    def close(self):
+        self.conn.close()
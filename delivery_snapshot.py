@@ -0,0 +1,138 @@
+import time
+from bisect import bisect_left, insort
+
+
+class DeliverySnapshot:
+    """In-memory copy of every delivery, filled by one registry read per refresh
+
+    Status, on-time and delivery-time aggregates are kept up to date as
+    deliveries are added or replaced, so reading them does not rescan.
+    """
+
+    def __init__(self):
+        self.deliveries = {}
+        self._reset_aggregates()
+
+    def _reset_aggregates(self):
+        self._status_counts = {'In Transit': 0, 'Delivered': 0, 'Delayed': 0, 'Preparing for Shipment': 0}
+        self._on_time = 0
+        self._late = 0
+        # Expected dates of undelivered rows, sorted, to split At Risk from On Track at any time
+        self._pending_expected = []
+        self._delivered_seconds = 0
+        self._delivered_count = 0
+
+    def _count(self, delivery, sign):
+        if delivery['status'] in self._status_counts:
+            self._status_counts[delivery['status']] += sign
+        if delivery['status'] == 'Delivered':
+            if on_time_category(delivery, 0) == 'On-Time':
+                self._on_time += sign
+            else:
+                self._late += sign
+            if delivery['actual_delivery_date'] > 0:
+                self._delivered_seconds += sign * (delivery['actual_delivery_date'] - delivery['timestamp'])
+                self._delivered_count += sign
+        elif sign > 0:
+            insort(self._pending_expected, delivery['expected_delivery_date'])
+        else:
+            del self._pending_expected[bisect_left(self._pending_expected, delivery['expected_delivery_date'])]
+
+    def _recount(self):
+        """Rebuild every aggregate in one pass; insort is kept for single puts"""
+        self._reset_aggregates()
+        pending = []
+        for delivery in self.deliveries.values():
+            status = delivery['status']
+            if status in self._status_counts:
+                self._status_counts[status] += 1
+            if status != 'Delivered':
+                pending.append(delivery['expected_delivery_date'])
+                continue
+            if on_time_category(delivery, 0) == 'On-Time':
+                self._on_time += 1
+            else:
+                self._late += 1
+            if delivery['actual_delivery_date'] > 0:
+                self._delivered_seconds += delivery['actual_delivery_date'] - delivery['timestamp']
+                self._delivered_count += 1
+        pending.sort()
+        self._pending_expected = pending
+
+    def refresh(self, bc, page_size=100):
+        """Read every registered delivery in pages and replace the stored ones"""
+        deliveries = {}
+        for delivery in bc.iter_deliveries(page_size):
+            deliveries[delivery['id']] = delivery
+        self.deliveries = deliveries
+        self._recount()
+        return len(deliveries)
+
+    def load(self, deliveries):
+        """Replace the stored deliveries with an already-fetched list"""
+        self.deliveries = {d['id']: d for d in deliveries}
+        self._recount()
+
+    def clear(self):
+        self.deliveries = {}
+        self._reset_aggregates()
+
+    def put(self, delivery):
+        """Insert or replace a single delivery"""
+        old = self.deliveries.get(delivery['id'])
+        if old is not None:
+            self._count(old, -1)
+        self.deliveries[delivery['id']] = delivery
+        self._count(delivery, 1)
+
+    def get(self, delivery_id):
+        return self.deliveries.get(delivery_id)
+
+    def ids(self):
+        return list(self.deliveries)
+
+    def values(self):
+        return list(self.deliveries.values())
+
+    def __len__(self):
+        return len(self.deliveries)
+
+    def __contains__(self, delivery_id):
+        return delivery_id in self.deliveries
+
+    def status_counts(self):
+        """Count deliveries per known status"""
+        return dict(self._status_counts)
+
+    def performance_counts(self, current_time=None):
+        """Count deliveries per on-time category"""
+        if current_time is None:
+            current_time = int(time.time())
+        # Undelivered rows are At Risk once current_time passes their expected date
+        at_risk = bisect_left(self._pending_expected, current_time)
+        return {
+            'On-Time': self._on_time,
+            'Late': self._late,
+            'At Risk': at_risk,
+            'On Track': len(self._pending_expected) - at_risk
+        }
+
+    def average_delivery_time(self):
+        """Average seconds from creation to delivery, or None without delivered rows"""
+        if self._delivered_count == 0:
+            return None
+        return self._delivered_seconds / self._delivered_count
+
+
+def on_time_category(delivery, current_time):
+    """Classify a delivery as On-Time, Late, At Risk or On Track"""
+    expected = delivery['expected_delivery_date']
+    actual = delivery['actual_delivery_date']
+
+    if delivery['status'] == 'Delivered':
+        if actual > 0 and actual <= expected:
+            return 'On-Time'
+        return 'Late'
+    if current_time > expected:
+        return 'At Risk'
+    return 'On Track'
@@ -0,0 +1,242 @@
+import time
+from datetime import datetime
+from functools import lru_cache
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QEvent, Signal
+from PySide6.QtGui import QColor, QPalette
+from PySide6.QtWidgets import QApplication, QStyle, QStyledItemDelegate, QStyleOptionButton
+
+from delivery_snapshot import on_time_category
+
+HEADERS = [
+    "ID", "Delay Risk %", "Status", "On-Time Status", "Origin Lat", "Origin Lon",
+    "Dest Lat", "Dest Lon", "Current Lat", "Current Lon",
+    "Timestamp", "Expected Date", "Actual Date", "Edit", "History"
+]
+RISK_COLUMN = 1
+EDIT_COLUMN = 13
+HISTORY_COLUMN = 14
+
+STATUS_COLORS = {
+    'In Transit': QColor(0, 0, 139),
+    'Delivered': QColor(0, 100, 0),
+    'Delayed': QColor(220, 20, 60),
+    'Preparing for Shipment': QColor(255, 140, 0)
+}
+ON_TIME_COLORS = {
+    'On-Time': QColor(0, 100, 0),
+    'Late': QColor(220, 20, 60),
+    'At Risk': QColor(220, 20, 60),
+    'On Track': QColor(0, 0, 139)
+}
+
+# Delivery dict key behind each plain column
+COLUMN_KEYS = {
+    0: 'id', 2: 'status', 4: 'origin_lat', 5: 'origin_lon', 6: 'dest_lat', 7: 'dest_lon',
+    8: 'current_lat', 9: 'current_lon', 10: 'timestamp', 11: 'expected_delivery_date',
+    12: 'actual_delivery_date'
+}
+
+
+@lru_cache(maxsize=4096)
+def format_date(timestamp):
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M') if timestamp > 0 else 'N/A'
+
+
+def risk_color(delay_prob):
+    if delay_prob < 30:
+        return QColor(0, 100, 0)
+    if delay_prob < 60:
+        return QColor(255, 140, 0)
+    return QColor(220, 20, 60)
+
+
+class DeliveryTableModel(QAbstractTableModel):
+    """Deliveries shown in the View Deliveries table
+
+    Rows are plain delivery dicts. Cell text and colours are produced in
+    data(), so only rows scrolled into view are ever formatted.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.deliveries = []
+        self.row_of = {}
+        # delivery ID -> (probability or None for a failed prediction, model version)
+        self.risks = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.deliveries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        delivery = self.deliveries[index.row()]
+        column = index.column()
+
+        if column == RISK_COLUMN:
+            return self._risk_data(delivery['id'], role)
+        if column == 3:
+            on_time_status = on_time_category(delivery, int(time.time()))
+            if role == Qt.DisplayRole:
+                return on_time_status
+            if role == Qt.BackgroundRole:
+                return ON_TIME_COLORS[on_time_status]
+            return None
+
+        if role == Qt.DisplayRole:
+            if column in (0, 2):
+                return delivery[COLUMN_KEYS[column]]
+            if 4 <= column <= 9:
+                return f"{delivery[COLUMN_KEYS[column]]:.4f}"
+            if column == 10:
+                return str(delivery['timestamp'])
+            if column in (11, 12):
+                return format_date(delivery[COLUMN_KEYS[column]])
+        elif role == Qt.BackgroundRole and column == 2:
+            return STATUS_COLORS.get(delivery['status'])
+        return None
+
+    def _risk_data(self, delivery_id, role):
+        if delivery_id not in self.risks:
+            return "-" if role == Qt.DisplayRole else None
+        delay_prob, version = self.risks[delivery_id]
+        if role == Qt.DisplayRole:
+            return "Error" if delay_prob is None else f"{delay_prob:.1f}%"
+        if role == Qt.BackgroundRole and delay_prob is not None:
+            return risk_color(delay_prob)
+        if role == Qt.ToolTipRole and version:
+            return f"Model {version}"
+        if role == Qt.UserRole:
+            return version
+        return None
+
+    def _sort_key(self, column):
+        if column == RISK_COLUMN:
+            def key(delivery):
+                delay_prob = self.risks.get(delivery['id'], (None, None))[0]
+                return -1.0 if delay_prob is None else delay_prob
+            return key
+        if column == 3:
+            now = int(time.time())
+            return lambda delivery: on_time_category(delivery, now)
+        if column in COLUMN_KEYS:
+            name = COLUMN_KEYS[column]
+            return lambda delivery: delivery[name]
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        key = self._sort_key(column)
+        if key is None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_cells = [(self.deliveries[i.row()]['id'], i.column()) for i in old_indexes]
+        self.deliveries.sort(key=key, reverse=order == Qt.DescendingOrder)
+        self._reindex()
+        self.changePersistentIndexList(old_indexes, [self.index(self.row_of[d_id], col) for d_id, col in old_cells])
+        self.layoutChanged.emit()
+
+    def _reindex(self):
+        self.row_of = {delivery['id']: row for row, delivery in enumerate(self.deliveries)}
+
+    def set_deliveries(self, deliveries):
+        """Replace every row; delay risks are cleared like a fresh table"""
+        self.beginResetModel()
+        self.deliveries = list(deliveries)
+        self.risks = {}
+        self._reindex()
+        self.endResetModel()
+
+    def clear(self):
+        self.set_deliveries([])
+
+    def upsert(self, deliveries):
+        """Update rows already shown and append new ones; changed rows lose their delay risk"""
+        new = []
+        for delivery in deliveries:
+            row = self.row_of.get(delivery['id'])
+            if row is None:
+                new.append(delivery)
+                continue
+            self.deliveries[row] = delivery
+            self.risks.pop(delivery['id'], None)
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(HEADERS) - 1))
+        self.append(new)
+
+    def append(self, deliveries):
+        """Append a batch of new rows with a single insert notification"""
+        # Keyed by ID so a repeated delivery in one batch still gets a single row
+        deliveries = list({d['id']: d for d in deliveries if d['id'] not in self.row_of}.values())
+        if not deliveries:
+            return
+        first = len(self.deliveries)
+        self.beginInsertRows(QModelIndex(), first, first + len(deliveries) - 1)
+        for row, delivery in enumerate(deliveries, start=first):
+            self.deliveries.append(delivery)
+            self.row_of[delivery['id']] = row
+        self.endInsertRows()
+
+    def delivery_id(self, row):
+        return self.deliveries[row]['id']
+
+    def row_for(self, delivery_id):
+        """Row showing delivery_id, or None"""
+        return self.row_of.get(delivery_id)
+
+    def set_risks(self, results):
+        """Show (delivery_id, probability or None, model version) results in the Delay Risk column"""
+        rows = []
+        for delivery_id, delay_prob, version in results:
+            row = self.row_of.get(delivery_id)
+            if row is not None:
+                self.risks[delivery_id] = (delay_prob, version)
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(self.index(min(rows), RISK_COLUMN), self.index(max(rows), RISK_COLUMN))
+
+
+class ButtonDelegate(QStyledItemDelegate):
+    """Paints a push button in every cell of a column and reports clicks by row
+
+    Replaces one QPushButton widget per row, which does not scale past a few
+    thousand rows.
+    """
+
+    clicked = Signal(int)
+
+    def __init__(self, text, color, parent=None):
+        super().__init__(parent)
+        self.text = text
+        self.color = QColor(color)
+        self.pressed = None
+
+    def paint(self, painter, option, index):
+        button = QStyleOptionButton()
+        button.rect = option.rect.adjusted(2, 2, -2, -2)
+        button.text = self.text
+        button.state = QStyle.State_Enabled
+        button.state |= QStyle.State_Sunken if self.pressed == (index.row(), index.column()) else QStyle.State_Raised
+        button.palette = QPalette(option.palette)
+        button.palette.setColor(QPalette.Button, self.color)
+        button.palette.setColor(QPalette.ButtonText, Qt.white)
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(QStyle.CE_PushButton, button, painter, option.widget)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonPress and event.button() == Qt.LeftButton:
+            self.pressed = (index.row(), index.column())
+            return True
+        if event.type() == QEvent.MouseButtonRelease and self.pressed is not None:
+            pressed, self.pressed = self.pressed, None
+            if pressed == (index.row(), index.column()) and option.rect.contains(event.position().toPoint()):
+                self.clicked.emit(index.row())
+            return True
+        return False
@@ -1,8 +1,35 @@
 using Random
 using JSON
 
+include("columnar_store.jl")
+
 Random.seed!(42)
 
+# Ground-truth delay score before noise
+# Logic: High risk factors + low progress + time pressure = delay
+function base_delay_score(weather_risk, traffic_risk, remaining_distance, time_until_expected, percent_complete)
+    delay_score = 0.0
+    
+    # Weather and traffic contribute heavily
+    delay_score += (weather_risk - 1) / 4 * 0.35
+    delay_score += (traffic_risk - 1) / 4 * 0.30
+    
+    # Remaining distance matters
+    delay_score += min(remaining_distance / 3000, 1.0) * 0.20
+    
+    # Time pressure is critical
+    if time_until_expected < 0
+        delay_score += 0.40
+    else
+        delay_score += (1 - time_until_expected / (7 * 24 * 3600)) * 0.40
+    end
+    
+    # Progress helps
+    delay_score -= (percent_complete / 100) * 0.25
+    
+    return delay_score
+end
+
 # Generate synthetic training data
 function generate_training_data(n_samples=500)
     data = []
@@ -23,25 +50,7 @@ function generate_training_data(n_samples=500)
         traffic_risk = rand(1:5)
         
         # Determine if delayed (ground truth)
-        # Logic: High risk factors + low progress + time pressure = delay
-        delay_score = 0.0
-        
-        # Weather and traffic contribute heavily
-        delay_score += (weather_risk - 1) / 4 * 0.35
-        delay_score += (traffic_risk - 1) / 4 * 0.30
-        
-        # Remaining distance matters
-        delay_score += min(remaining_distance / 3000, 1.0) * 0.20
-        
-        # Time pressure is critical
-        if time_until_expected < 0
-            delay_score += 0.40
-        else
-            delay_score += (1 - time_until_expected / (7 * 24 * 3600)) * 0.40
-        end
-        
-        # Progress helps
-        delay_score -= (percent_complete / 100) * 0.25
+        delay_score = base_delay_score(weather_risk, traffic_risk, remaining_distance, time_until_expected, percent_complete)
         
         # Add some randomness
         delay_score += randn() * 0.1
@@ -66,6 +75,55 @@ function generate_training_data(n_samples=500)
     return data
 end
 
+# Generate n samples as columns (same distribution as generate_training_data)
+function generate_columns(n)
+    total_distance = rand(500:3000, n)
+    percent_complete = rand(0:100, n)
+    remaining_distance = total_distance .* (1 .- percent_complete ./ 100)
+    elapsed_days = rand(0:10, n)
+    expected_days = rand(1:7, n)
+    time_until_expected = (expected_days .- elapsed_days) .* 24 .* 3600
+    weather_risk = rand(1:5, n)
+    traffic_risk = rand(1:5, n)
+    
+    delay_score = base_delay_score.(weather_risk, traffic_risk, remaining_distance, time_until_expected, percent_complete) .+ randn(n) .* 0.1
+    
+    return Dict(
+        "total_distance" => total_distance,
+        "remaining_distance" => remaining_distance,
+        "percent_complete" => percent_complete,
+        "elapsed_days" => elapsed_days,
+        "expected_days" => expected_days,
+        "time_until_expected" => time_until_expected,
+        "weather_risk" => weather_risk,
+        "traffic_risk" => traffic_risk,
+        "is_delayed" => Int.(delay_score .> 0.5),
+        "delay_score" => delay_score
+    )
+end
+
+# Chunked columnar mode: julia generate_training_data.jl --columnar DIR N [CHUNK_SIZE]
+# Only one chunk is held in memory, so N can be far larger than RAM allows as JSON
+function generate_columnar(dir, n_samples, chunk_size=1_000_000)
+    isdir(dir) && rm(dir; recursive=true)
+    delayed_count = 0
+    for start in 1:chunk_size:n_samples
+        columns = generate_columns(min(chunk_size, n_samples - start + 1))
+        delayed_count += sum(columns["is_delayed"])
+        append_chunk!(dir, columns)
+        println("Wrote $(min(start + chunk_size - 1, n_samples))/$n_samples samples")
+    end
+    
+    println("Generated $n_samples training samples")
+    println("Delayed: $delayed_count ($(round(delayed_count/n_samples*100, digits=1))%)")
+    println("Saved to $dir")
+end
+
+if length(ARGS) >= 3 && ARGS[1] == "--columnar"
+    generate_columnar(ARGS[2], parse(Int, ARGS[3]), length(ARGS) >= 4 ? parse(Int, ARGS[4]) : 1_000_000)
+    exit()
+end
+
 # Generate and save training data
 training_data = generate_training_data(500)
 
@@ -0,0 +1,146 @@
+import importlib.util
+from PySide6.QtCore import Qt, QTimer, QUrl
+from PySide6.QtWidgets import QLabel, QVBoxLayout, QWidget
+
+from map_builder import map_page, upsert_script, remove_script, visible_script
+
+# Deltas arriving within this window are sent to the page together
+FLUSH_MS = 250
+# Deliveries per runJavaScript call, so a full load does not stall the page
+UPSERT_CHUNK = 5000
+
+
+def web_engine_available():
+    """QtWebEngine ships separately on some platforms; without it the Map tab
+    keeps only the export-to-browser button"""
+    return importlib.util.find_spec('PySide6.QtWebEngineWidgets') is not None
+
+
+def map_key(delivery):
+    """Everything the map draws for a delivery; unchanged keys are not re-sent"""
+    return (delivery['status'], delivery['current_lat'], delivery['current_lon'],
+            delivery['origin_lat'], delivery['origin_lon'], delivery['dest_lat'], delivery['dest_lon'])
+
+
+class LiveMapView(QWidget):
+    """Clustered delivery map embedded in the Map tab
+
+    The page is loaded once, the first time the tab is shown, so QtWebEngine
+    stays out of startup. Afterwards only the deliveries whose position,
+    status or route changed are pushed to it through runJavaScript.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Delivery ID -> map_key of what the page currently shows
+        self.shown = {}
+        self.pending_upserts = {}
+        self.pending_removals = set()
+        self.pending_reset = False
+        self.statuses = None
+        self.ready = False
+        self.view = None
+        self.available = web_engine_available()
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        if not self.available:
+            fallback = QLabel("Embedded map unavailable (QtWebEngine is not installed).\n"
+                              "Use Generate Interactive Map to open it in a browser.")
+            fallback.setAlignment(Qt.AlignCenter)
+            layout.addWidget(fallback)
+        self.setLayout(layout)
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(FLUSH_MS)
+        self.flush_timer.timeout.connect(self.flush)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.available and self.view is None:
+            from PySide6.QtWebEngineWidgets import QWebEngineView
+            self.view = QWebEngineView()
+            self.view.loadFinished.connect(self.on_load_finished)
+            # The base URL only gives the page an origin for the Leaflet CDN
+            self.view.setHtml(map_page(), QUrl("https://unpkg.com/"))
+            self.layout().addWidget(self.view)
+
+    def on_load_finished(self, ok):
+        if not ok:
+            print("Error loading embedded map page")
+            return
+        self.ready = True
+        if self.statuses is not None:
+            self.view.page().runJavaScript(visible_script(self.statuses))
+        self.flush()
+
+    def set_deliveries(self, deliveries):
+        """Make the map show exactly these deliveries, sending only the differences"""
+        if not self.available:
+            return
+        seen = set()
+        for delivery in deliveries:
+            seen.add(delivery['id'])
+            self._stage(delivery)
+        for delivery_id in self.pending_upserts.keys() - seen:
+            del self.pending_upserts[delivery_id]
+        self.pending_removals |= self.shown.keys() - seen
+        self.flush_timer.start()
+
+    def update_deliveries(self, deliveries):
+        """Push changed deliveries; unchanged ones are skipped"""
+        if not self.available:
+            return
+        for delivery in deliveries:
+            self._stage(delivery)
+        self.flush_timer.start()
+
+    def clear(self):
+        if not self.available:
+            return
+        self.shown = {}
+        self.pending_upserts = {}
+        self.pending_removals = set()
+        self.pending_reset = True
+        self.flush_timer.start()
+
+    def set_visible_statuses(self, statuses):
+        if not self.available:
+            return
+        self.statuses = list(statuses)
+        if self.ready:
+            self.view.page().runJavaScript(visible_script(self.statuses))
+
+    def _stage(self, delivery):
+        delivery_id = delivery['id']
+        if not delivery_id:
+            return
+        self.pending_removals.discard(delivery_id)
+        key = map_key(delivery)
+        if self.shown.get(delivery_id) == key:
+            self.pending_upserts.pop(delivery_id, None)
+        else:
+            self.pending_upserts[delivery_id] = delivery
+
+    def flush(self):
+        """Send staged changes to the page once it has loaded"""
+        if not self.ready:
+            return
+        page = self.view.page()
+        if self.pending_reset:
+            page.runJavaScript("supplyMap.clear();")
+            if self.statuses is not None:
+                page.runJavaScript(visible_script(self.statuses))
+            self.pending_reset = False
+        if self.pending_removals:
+            page.runJavaScript(remove_script(self.pending_removals))
+            for delivery_id in self.pending_removals:
+                self.shown.pop(delivery_id, None)
+            self.pending_removals = set()
+        deliveries = list(self.pending_upserts.values())
+        for start in range(0, len(deliveries), UPSERT_CHUNK):
+            page.runJavaScript(upsert_script(deliveries[start:start + UPSERT_CHUNK]))
+        for delivery in deliveries:
+            self.shown[delivery['id']] = map_key(delivery)
+        self.pending_upserts = {}
@@ -0,0 +1,258 @@
+import json
+
+STATUS_COLORS = {
+    'In Transit': '#00008B',
+    'Delivered': '#006400',
+    'Delayed': '#DC143C',
+    'Preparing for Shipment': '#FF8C00'
+}
+
+# Leaflet page with one marker-clustered layer per status. Popups and the
+# origin -> current -> destination route are built in the browser when a
+# marker is clicked, so the page holds only one point per delivery.
+# supplyMap.upsert/remove/setVisible also let the live view push deltas.
+MAP_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Supply Chain Map</title>
+<link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css">
+<link rel="stylesheet" href="https://unpkg.com/leaflet.markercluster@1.5.3/dist/MarkerCluster.css">
+<link rel="stylesheet" href="https://unpkg.com/leaflet.markercluster@1.5.3/dist/MarkerCluster.Default.css">
+<script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
+<script src="https://unpkg.com/leaflet.markercluster@1.5.3/dist/leaflet.markercluster.js"></script>
+<style>
+html, body, #map { height: 100%; margin: 0; }
+.legend { background: white; border: 2px solid grey; padding: 6px 10px; font-size: 13px; line-height: 20px; }
+.legend i { display: inline-block; width: 12px; height: 12px; border-radius: 6px; margin-right: 6px; }
+</style>
+</head>
+<body>
+<div id="map"></div>
+<script>
+var COLORS = __COLORS__;
+
+var map = L.map('map', {preferCanvas: true}).setView([39.8283, -98.5795], 4);
+L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+    maxZoom: 18,
+    attribution: '&copy; OpenStreetMap contributors'
+}).addTo(map);
+
+function distanceKm(a, b) {
+    var rad = Math.PI / 180;
+    var dlat = (b[0] - a[0]) * rad, dlon = (b[1] - a[1]) * rad;
+    var h = Math.pow(Math.sin(dlat / 2), 2) + Math.cos(a[0] * rad) * Math.cos(b[0] * rad) * Math.pow(Math.sin(dlon / 2), 2);
+    return 6371 * 2 * Math.asin(Math.sqrt(h));
+}
+
+// Delivery IDs and statuses come from the chain or imported CSVs, so they are
+// escaped before going into popup and tooltip HTML
+function escapeHtml(text) {
+    return String(text).replace(/[&<>"']/g, function (c) {
+        return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'}[c];
+    });
+}
+
+function colorFor(status) {
+    return COLORS[status] || 'gray';
+}
+
+var supplyMap = (function () {
+    var clusters = {}, markers = {}, hidden = {};
+    var control = L.control.layers(null, {}, {collapsed: false}).addTo(map);
+    // Route and endpoints for the delivery whose popup is open
+    var route = L.layerGroup().addTo(map), routeId = null;
+
+    var legend = L.control({position: 'bottomright'});
+    legend.onAdd = function () { return L.DomUtil.create('div', 'legend'); };
+    legend.addTo(map);
+
+    function updateLegend() {
+        legend.getContainer().innerHTML = '<b>Map Legend</b><br>' + Object.keys(COLORS).map(function (status) {
+            var count = clusters[status] ? clusters[status].getLayers().length : 0;
+            return '<i style="background:' + COLORS[status] + '"></i>' + status + ' (' + count + ')';
+        }).join('<br>') + '<br>Click a delivery for its route';
+    }
+
+    function clusterFor(status) {
+        if (!clusters[status]) {
+            clusters[status] = L.markerClusterGroup({chunkedLoading: true});
+            if (!hidden[status]) {
+                clusters[status].addTo(map);
+            }
+            control.addOverlay(clusters[status], '<span style="color:' + colorFor(status) + '">' + escapeHtml(status) + '</span>');
+        }
+        return clusters[status];
+    }
+
+    function popupHtml(p, current) {
+        var km = distanceKm(current, p.d), miles = km * 0.621371;
+        return '<b>' + escapeHtml(p.id) + '</b><br>Status: ' + escapeHtml(p.s) +
+            '<br>Current: (' + current[0].toFixed(2) + ', ' + current[1].toFixed(2) + ')' +
+            '<br>Destination: (' + p.d[0].toFixed(2) + ', ' + p.d[1].toFixed(2) + ')' +
+            '<br><b>Distance to Destination: ' + miles.toFixed(1) + ' miles (' + km.toFixed(1) + ' km)</b>';
+    }
+
+    function drawRoute(p, current) {
+        route.clearLayers();
+        routeId = p.id;
+        L.polyline([p.o, current, p.d], {color: colorFor(p.s), weight: 2, opacity: 0.6, dashArray: '5, 10'}).addTo(route);
+        L.circleMarker(p.o, {radius: 5, color: 'gray', fillColor: 'white', fillOpacity: 0.8}).bindTooltip('Origin').addTo(route);
+        L.circleMarker(p.d, {radius: 5, color: 'black', fillColor: 'black', fillOpacity: 0.8}).bindTooltip('Destination').addTo(route);
+    }
+
+    function clearRoute(id) {
+        if (routeId === id) {
+            route.clearLayers();
+            routeId = null;
+        }
+    }
+
+    function makeMarker(feature) {
+        var p = feature.properties;
+        var current = [feature.geometry.coordinates[1], feature.geometry.coordinates[0]];
+        var marker = L.circleMarker(current, {radius: 7, color: colorFor(p.s), fillColor: colorFor(p.s), fillOpacity: 0.9, weight: 1});
+        marker.status = p.s;
+        marker.bindTooltip(escapeHtml(p.id));
+        marker.bindPopup(function () { return popupHtml(p, current); });
+        marker.on('popupopen', function () { drawRoute(p, current); });
+        marker.on('popupclose', function () { clearRoute(p.id); });
+        return marker;
+    }
+
+    function detach(id) {
+        var old = markers[id];
+        if (old) {
+            clusters[old.status].removeLayer(old);
+            delete markers[id];
+        }
+        return old;
+    }
+
+    // Add or replace deliveries. A delivery whose popup is open gets it
+    // reopened on the new marker when that marker is visible; otherwise
+    // (clustered or filtered out) its route is cleared.
+    function upsert(features) {
+        var added = {}, reopen = null, followedId = null;
+        features.forEach(function (feature) {
+            var id = feature.properties.id;
+            if (routeId === id) {
+                followedId = id;
+            }
+            detach(id);
+            var marker = markers[id] = makeMarker(feature);
+            (added[marker.status] = added[marker.status] || []).push(marker);
+            if (followedId === id) {
+                reopen = marker;
+            }
+        });
+        Object.keys(added).forEach(function (status) { clusterFor(status).addLayers(added[status]); });
+        if (reopen) {
+            if (map.hasLayer(reopen)) {
+                reopen.openPopup();
+            } else {
+                clearRoute(followedId);
+            }
+        }
+        updateLegend();
+    }
+
+    function remove(ids) {
+        ids.forEach(function (id) {
+            detach(id);
+            clearRoute(id);
+        });
+        updateLegend();
+    }
+
+    function clear() {
+        Object.keys(clusters).forEach(function (status) { clusters[status].clearLayers(); });
+        markers = {};
+        route.clearLayers();
+        routeId = null;
+        updateLegend();
+    }
+
+    // Show only the given statuses
+    function setVisible(statuses) {
+        Object.keys(COLORS).forEach(function (status) {
+            hidden[status] = statuses.indexOf(status) < 0;
+            if (clusters[status]) {
+                if (hidden[status]) {
+                    map.removeLayer(clusters[status]);
+                } else {
+                    map.addLayer(clusters[status]);
+                }
+            }
+        });
+    }
+
+    updateLegend();
+    return {upsert: upsert, remove: remove, clear: clear, setVisible: setVisible};
+})();
+
+var LAYERS = __LAYERS__;
+Object.keys(LAYERS).forEach(function (status) { supplyMap.upsert(LAYERS[status].features); });
+</script>
+</body>
+</html>
+"""
+
+
+def delivery_feature(delivery):
+    """GeoJSON point at the current position; status, origin and destination ride along in properties"""
+    return {
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [round(delivery['current_lon'], 5), round(delivery['current_lat'], 5)]},
+        'properties': {
+            'id': delivery['id'],
+            's': delivery['status'],
+            'o': [round(delivery['origin_lat'], 5), round(delivery['origin_lon'], 5)],
+            'd': [round(delivery['dest_lat'], 5), round(delivery['dest_lon'], 5)]
+        }
+    }
+
+
+def status_feature_collections(deliveries, statuses):
+    """One FeatureCollection per requested status"""
+    layers = {status: {'type': 'FeatureCollection', 'features': []} for status in statuses}
+    for delivery in deliveries:
+        if delivery['status'] in layers:
+            layers[delivery['status']]['features'].append(delivery_feature(delivery))
+    return layers
+
+
+def script_json(value):
+    """JSON that is safe inside a <script> block: a delivery ID containing
+    </script> or <!-- cannot end the script or switch the HTML parser's state"""
+    return (json.dumps(value, separators=(',', ':'))
+            .replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026'))
+
+
+def map_page(layers=None):
+    """Map page preloaded with status -> FeatureCollection layers"""
+    return (MAP_PAGE_TEMPLATE
+            .replace('__COLORS__', script_json(STATUS_COLORS))
+            .replace('__LAYERS__', script_json(layers or {})))
+
+
+def write_clustered_map(deliveries, statuses, path='supply_chain_map.html'):
+    """Write the clustered map for deliveries with the given statuses; returns the delivery count"""
+    layers = status_feature_collections(deliveries, statuses)
+    with open(path, 'w') as f:
+        f.write(map_page(layers))
+    return sum(len(layer['features']) for layer in layers.values())
+
+
+def upsert_script(deliveries):
+    """JavaScript adding or moving deliveries on a loaded map page"""
+    features = [delivery_feature(delivery) for delivery in deliveries]
+    return f"supplyMap.upsert({script_json(features)});"
+
+
+def remove_script(delivery_ids):
+    return f"supplyMap.remove({script_json(list(delivery_ids))});"
+
+
+def visible_script(statuses):
+    return f"supplyMap.setVisible({script_json(list(statuses))});"
@@ -1,4 +1,5 @@
 using JSON
+using SHA
 using Statistics
 
 # Simple logistic regression for delay prediction
@@ -15,7 +16,63 @@ function haversine_distance(lat1, lon1, lat2, lon2)
     return R * c
 end
 
-function predict_delay_probability(delivery_data, weather_risk, traffic_risk)
+const MODEL_PATH = "trained_model.json"
+const DEFAULT_WEIGHTS = [0.35, 0.30, 0.20, 0.40, -0.25]
+const DEFAULT_BIAS = -0.5
+
+struct Model
+    weights::Vector{Float64}
+    bias::Float64
+    version::String
+end
+
+# Active model and the mtime of the file it came from
+const ACTIVE_MODEL = Ref{Union{Model,Nothing}}(nothing)
+const ACTIVE_MTIME = Ref{Float64}(-1.0)
+
+# Parse and validate trained_model.json, tagged "<version>-<sha256 prefix>"
+function read_model(path)
+    raw = read(path)
+    params = JSON.parse(String(copy(raw)))
+    weights = Float64.(params["weights"])
+    bias = Float64(params["bias"])
+    length(weights) == 5 || error("expected 5 weights, got $(length(weights))")
+    all(isfinite, weights) && isfinite(bias) || error("non-finite model parameters")
+    version = "$(get(params, "version", "v0"))-$(bytes2hex(sha256(raw))[1:12])"
+    return Model(weights, bias, version)
+end
+
+# Load the model once; reload only when the file's mtime changes and the new
+# file validates, otherwise keep serving the previous model
+function current_model()
+    mtime_now = isfile(MODEL_PATH) ? mtime(MODEL_PATH) : -1.0
+    if ACTIVE_MODEL[] !== nothing && mtime_now == ACTIVE_MTIME[]
+        return ACTIVE_MODEL[]
+    end
+    ACTIVE_MTIME[] = mtime_now
+    if mtime_now < 0
+        if ACTIVE_MODEL[] === nothing
+            println(stderr, "Warning: $(MODEL_PATH) not found, using default model weights")
+            ACTIVE_MODEL[] = Model(DEFAULT_WEIGHTS, DEFAULT_BIAS, "default")
+        end
+        return ACTIVE_MODEL[]
+    end
+    try
+        model = read_model(MODEL_PATH)
+        ACTIVE_MODEL[] === nothing || println(stderr, "Reloaded model $(model.version) (was $(ACTIVE_MODEL[].version))")
+        ACTIVE_MODEL[] = model
+    catch e
+        if ACTIVE_MODEL[] === nothing
+            println(stderr, "Warning: could not load $(MODEL_PATH) ($(sprint(showerror, e))), using default model weights")
+            ACTIVE_MODEL[] = Model(DEFAULT_WEIGHTS, DEFAULT_BIAS, "default")
+        else
+            println(stderr, "Warning: ignoring invalid model update in $(MODEL_PATH), keeping $(ACTIVE_MODEL[].version)")
+        end
+    end
+    return ACTIVE_MODEL[]
+end
+
+function predict_delay_probability(delivery_data, weather_risk, traffic_risk, model=current_model())
     # Extract features
     origin_lat = delivery_data["origin_lat"]
     origin_lon = delivery_data["origin_lon"]
@@ -43,26 +100,8 @@ function predict_delay_probability(delivery_data, weather_risk, traffic_risk)
     norm_remaining = min(remaining_distance / 3000, 1.0)  # Cap at 3000km
     norm_time_pressure = time_until_expected < 0 ? 1.0 : max(0, 1 - time_until_expected / (7 * 24 * 3600))
     
-    # Load trained weights
-    local w_weather, w_traffic, w_remaining, w_time_pressure, w_percent, bias
-    try
-        model_params = JSON.parsefile("trained_model.json")
-        weights = model_params["weights"]
-        w_weather = weights[1]
-        w_traffic = weights[2]
-        w_remaining = weights[3]
-        w_time_pressure = weights[4]
-        w_percent = weights[5]
-        bias = model_params["bias"]
-    catch
-        # Fallback to default weights if model file not found
-        w_weather = 0.35
-        w_traffic = 0.30
-        w_remaining = 0.20
-        w_time_pressure = 0.40
-        w_percent = -0.25
-        bias = -0.5
-    end
+    w_weather, w_traffic, w_remaining, w_time_pressure, w_percent = model.weights
+    bias = model.bias
     
     # Logistic regression
     z = bias + w_weather * norm_weather + w_traffic * norm_traffic + 
@@ -75,7 +114,51 @@ function predict_delay_probability(delivery_data, weather_risk, traffic_risk)
     return round(probability * 100, digits=1)
 end
 
+# Score a batch of deliveries; risks may be a single value or one per delivery
+function predict_batch(deliveries, weather_risk, traffic_risk, model=current_model())
+    n = length(deliveries)
+    weather = weather_risk isa AbstractVector ? weather_risk : fill(weather_risk, n)
+    traffic = traffic_risk isa AbstractVector ? traffic_risk : fill(traffic_risk, n)
+    return [predict_delay_probability(deliveries[i], weather[i], traffic[i], model) for i in 1:n]
+end
+
+# Long-lived worker: one JSON request per stdin line, one JSON reply per stdout line
+#   {"cmd": "ping"}                                          -> {"ok": true}
+#   {"delivery": {...}, "weather_risk": 2, "traffic_risk": 2} -> {"prediction": 42.1}
+#   {"deliveries": [...], "weather_risk": [...], ...}         -> {"predictions": [...]}
+# Every reply also carries "model_version", the model that produced it
+function serve()
+    for line in eachline(stdin)
+        isempty(strip(line)) && continue
+        reply = Dict{String,Any}()
+        try
+            request = JSON.parse(line)
+            haskey(request, "id") && (reply["id"] = request["id"])
+            weather_risk = get(request, "weather_risk", 2)
+            traffic_risk = get(request, "traffic_risk", 2)
+            model = current_model()
+            reply["model_version"] = model.version
+            if get(request, "cmd", "") == "ping"
+                reply["ok"] = true
+            elseif haskey(request, "deliveries")
+                reply["predictions"] = predict_batch(request["deliveries"], weather_risk, traffic_risk, model)
+            else
+                reply["prediction"] = predict_delay_probability(request["delivery"], weather_risk, traffic_risk, model)
+            end
+        catch e
+            reply["error"] = sprint(showerror, e)
+        end
+        println(JSON.json(reply))
+        flush(stdout)
+    end
+end
+
 function main()
+    if "--server" in ARGS
+        serve()
+        return
+    end
+    
     # Read input from stdin (JSON)
     input_json = readline()
     data = JSON.parse(input_json)
@@ -84,10 +167,12 @@ function main()
     weather_risk = get(data, "weather_risk", 2)
     traffic_risk = get(data, "traffic_risk", 2)
     
-    probability = predict_delay_probability(delivery_data, weather_risk, traffic_risk)
+    model = current_model()
+    probability = predict_delay_probability(delivery_data, weather_risk, traffic_risk, model)
     
-    # Output result
+    # Output result, then the version of the model that produced it
     println(probability)
+    println(model.version)
 end
 
 if abspath(PROGRAM_FILE) == @__FILE__
@@ -1,6 +1,24 @@
 import subprocess
 import json
 import math
+import os
+import queue
+import threading
+import time
+from model_registry import ModelRegistry
+# NumPy is imported where it is used, so importing this module (the dashboard
+# does at startup) stays cheap until the first prediction
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATH = os.path.join(SCRIPT_DIR, 'trained_model.json')
+
+# Same fallback as ml_model.jl when trained_model.json is missing
+DEFAULT_WEIGHTS = [0.35, 0.30, 0.20, 0.40, -0.25]
+DEFAULT_BIAS = -0.5
+
+# 'numpy' scores in-process, 'julia-server' keeps one ml_model.jl worker
+# running for the session, 'julia' runs ml_model.jl once per prediction
+ML_BACKEND = os.environ.get('ML_BACKEND', 'numpy')
 
 def haversine_distance(lat1, lon1, lat2, lon2):
     """Calculate distance between two points in km"""
@@ -15,13 +33,310 @@ def haversine_distance(lat1, lon1, lat2, lon2):
     c = 2 * math.asin(math.sqrt(a))
     return R * c
 
+def haversine_distances(lat1, lon1, lat2, lon2):
+    """Vectorized haversine_distance over NumPy arrays, in km"""
+    import numpy as np
+    lat1_rad, lon1_rad = np.radians(lat1), np.radians(lon1)
+    lat2_rad, lon2_rad = np.radians(lat2), np.radians(lon2)
+    
+    a = np.sin((lat2_rad - lat1_rad) / 2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin((lon2_rad - lon1_rad) / 2)**2
+    return 6371.0 * 2 * np.arcsin(np.sqrt(a))
+
+class DelayModel:
+    """Logistic regression from trained_model.json, evaluated with NumPy
+    
+    Reproduces predict_delay_probability in ml_model.jl for many deliveries
+    in one call.
+    """
+    
+    def __init__(self, weights, bias, version='default'):
+        import numpy as np
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.version = version
+    
+    def features(self, deliveries, weather_risk, traffic_risk, now=None):
+        """Normalised feature matrix (n, 5): weather, traffic, remaining, time pressure, percent"""
+        import numpy as np
+        if now is None:
+            now = time.time()
+        
+        def column(key):
+            return np.array([d[key] for d in deliveries], dtype=float)
+        
+        dest_lat, dest_lon = column('dest_lat'), column('dest_lon')
+        total_distance = haversine_distances(column('origin_lat'), column('origin_lon'), dest_lat, dest_lon)
+        remaining_distance = haversine_distances(column('current_lat'), column('current_lon'), dest_lat, dest_lon)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent_complete = np.where(total_distance > 0,
+                                        (total_distance - remaining_distance) / total_distance * 100, 0.0)
+        
+        time_until_expected = column('expected_delivery_date') - now
+        time_pressure = np.where(time_until_expected < 0, 1.0,
+                                 np.maximum(0.0, 1 - time_until_expected / (7 * 24 * 3600)))
+        
+        X = np.empty((len(deliveries), 5))
+        X[:, 0] = (np.broadcast_to(np.asarray(weather_risk, dtype=float), len(deliveries)) - 1) / 4
+        X[:, 1] = (np.broadcast_to(np.asarray(traffic_risk, dtype=float), len(deliveries)) - 1) / 4
+        X[:, 2] = np.minimum(remaining_distance / 3000, 1.0)
+        X[:, 3] = time_pressure
+        X[:, 4] = percent_complete / 100
+        return X
+    
+    def predict(self, deliveries, weather_risk=2, traffic_risk=2, now=None):
+        """Delay probability in percent (one decimal) for each delivery
+        
+        weather_risk and traffic_risk may be scalars or one value per delivery.
+        """
+        import numpy as np
+        if len(deliveries) == 0:
+            return np.empty(0)
+        z = self.bias + self.features(deliveries, weather_risk, traffic_risk, now) @ self.weights
+        return np.round(100 / (1 + np.exp(-z)), 1)
+
+# Loads trained_model.json once and reloads it when the file changes
+registry = ModelRegistry(MODEL_PATH, DelayModel, DEFAULT_WEIGHTS, DEFAULT_BIAS)
+
+def get_model():
+    """Current DelayModel from the registry"""
+    return registry.current()
+
+class JuliaWorker:
+    """Supervised `julia ml_model.jl --server` process
+    
+    Requests and replies are single JSON lines. The process is started on
+    first use, pinged when it has been idle, and restarted if it dies or
+    stops answering, so Julia's compile cost is paid once per session.
+    """
+    
+    def __init__(self, startup_timeout=120, request_timeout=10, health_interval=30):
+        self.startup_timeout = startup_timeout
+        self.request_timeout = request_timeout
+        self.health_interval = health_interval
+        self.process = None
+        self.replies = None
+        self.restarts = 0
+        self.last_reply = 0.0
+        # Version of the model the process reported in its latest reply
+        self.model_version = None
+        self.lock = threading.Lock()
+    
+    def _start(self):
+        self.process = subprocess.Popen(
+            ['julia', os.path.join(SCRIPT_DIR, 'ml_model.jl'), '--server'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            cwd=SCRIPT_DIR
+        )
+        # Each process gets its own queue so a stale reader cannot answer for a new one
+        self.replies = queue.Queue()
+        threading.Thread(target=self._read_replies, args=(self.process, self.replies), daemon=True).start()
+        # The first reply includes Julia's JIT warm-up
+        self._send({'cmd': 'ping'}, self.startup_timeout)
+    
+    @staticmethod
+    def _read_replies(process, replies):
+        for line in process.stdout:
+            replies.put(line)
+        replies.put(None)
+    
+    def _kill(self):
+        if self.process is not None:
+            try:
+                self.process.kill()
+                self.process.wait(timeout=5)
+            except Exception:
+                pass
+        self.process = None
+    
+    def _send(self, request, timeout):
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        line = self.replies.get(timeout=timeout)
+        if line is None:
+            raise RuntimeError("Julia worker exited")
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(reply['error'])
+        self.last_reply = time.monotonic()
+        self.model_version = reply.get('model_version', self.model_version)
+        return reply
+    
+    def _ensure_running(self):
+        if self.process is not None and self.process.poll() is None:
+            if time.monotonic() - self.last_reply < self.health_interval:
+                return
+            try:
+                self._send({'cmd': 'ping'}, self.request_timeout)
+                return
+            except Exception as e:
+                print(f"Julia worker failed health check: {e}")
+        if self.process is not None:
+            self.restarts += 1
+            self._kill()
+        self._start()
+    
+    def request(self, request):
+        """Send one request and return its reply, restarting the worker once on failure"""
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    self._ensure_running()
+                    return self._send(request, self.request_timeout)
+                except (OSError, RuntimeError, ValueError, queue.Empty) as e:
+                    # Broken pipe, crash or timeout: drop the process and retry once
+                    self._kill()
+                    self.restarts += 1
+                    if attempt:
+                        raise RuntimeError(f"Julia worker unavailable: {e}")
+    
+    def predict(self, deliveries, weather_risk=2, traffic_risk=2):
+        """Delay probabilities for many deliveries in one round trip
+        
+        Returns (probabilities, version of the Julia model that produced them).
+        """
+        if not deliveries:
+            return [], self.model_version
+        reply = self.request({
+            'deliveries': list(deliveries),
+            'weather_risk': weather_risk,
+            'traffic_risk': traffic_risk
+        })
+        return [float(p) for p in reply['predictions']], reply['model_version']
+    
+    def is_healthy(self):
+        try:
+            return self.request({'cmd': 'ping'}).get('ok', False)
+        except RuntimeError:
+            return False
+    
+    def close(self):
+        with self.lock:
+            if self.process is not None:
+                try:
+                    self.process.stdin.close()
+                    self.process.wait(timeout=5)
+                except Exception:
+                    pass
+                self._kill()
+
+_julia_worker = None
+
+def get_julia_worker():
+    """Shared JuliaWorker, started on first prediction"""
+    global _julia_worker
+    if _julia_worker is None:
+        _julia_worker = JuliaWorker()
+    return _julia_worker
+
+def close_julia_worker():
+    """Stop the shared JuliaWorker if one was started"""
+    global _julia_worker
+    if _julia_worker is not None:
+        _julia_worker.close()
+        _julia_worker = None
+
 def predict_delay(delivery, weather_risk=2, traffic_risk=2):
+    """Predict delay probability for one delivery"""
+    if ML_BACKEND == 'julia':
+        return predict_delay_julia(delivery, weather_risk, traffic_risk)
+    if ML_BACKEND == 'julia-server':
+        try:
+            return get_julia_worker().predict([delivery], weather_risk, traffic_risk)[0][0]
+        except Exception as e:
+            print(f"ML prediction error: {e}")
+            return None
+    try:
+        return float(get_model().predict([delivery], weather_risk, traffic_risk)[0])
+    except Exception as e:
+        print(f"ML prediction error: {e}")
+        return None
+
+def expected_version(model):
+    """Version the configured backend is expected to score with
+    
+    The Julia backends load trained_model.json themselves; a running server
+    reports its model with every reply, the per-call script reads the same
+    file as the registry.
+    """
+    if ML_BACKEND == 'julia-server' and _julia_worker is not None and _julia_worker.model_version:
+        return _julia_worker.model_version
+    return model.version
+
+def predict_delay_batch(deliveries, risks=None, cache=None, model=None):
+    """Predict delay probability for many deliveries in one call
+    
+    risks maps delivery ID to (weather_risk, traffic_risk); missing IDs use
+    (2, 2). With a PredictionCache only uncached deliveries are scored.
+    Pass model to pin the registry model used by the numpy backend.
+    Returns (probabilities, model version): one probability per delivery,
+    0.0 for delivered ones and None where scoring failed, and the version
+    reported by the backend that produced them.
+    """
+    risks = risks or {}
+    now = time.time()
+    model = model or get_model()
+    version = expected_version(model)
+    results, scored_version = _score_batch(deliveries, risks, cache, model, version, now)
+    if scored_version is not None and scored_version != version:
+        # The backend switched models; cached scores belong to the old one
+        version = scored_version
+        results, scored_version = _score_batch(deliveries, risks, cache, model, version, now)
+    return results, scored_version or version
+
+def _score_batch(deliveries, risks, cache, model, version, now):
+    """Scores plus the version the backend reported (None if nothing was scored)"""
+    results = [0.0 if d['status'] == 'Delivered' else None for d in deliveries]
+    
+    active = []
+    keys = {}
+    for i, d in enumerate(deliveries):
+        if d['status'] == 'Delivered':
+            continue
+        if cache is not None:
+            weather, traffic = risks.get(d['id'], (2, 2))
+            keys[i] = cache.key(d, weather, traffic, version, now)
+            results[i] = cache.get(keys[i])
+            if results[i] is not None:
+                continue
+        active.append(i)
+    if not active:
+        return results, None
+    
+    pending = [deliveries[i] for i in active]
+    weather = [risks.get(d['id'], (2, 2))[0] for d in pending]
+    traffic = [risks.get(d['id'], (2, 2))[1] for d in pending]
+    try:
+        if ML_BACKEND == 'julia':
+            replies = [run_julia(d, w, t) for d, w, t in zip(pending, weather, traffic)]
+            scores = [score for score, _ in replies]
+            scored_version = next((v for _, v in reversed(replies) if v), None)
+        elif ML_BACKEND == 'julia-server':
+            scores, scored_version = get_julia_worker().predict(pending, weather, traffic)
+        else:
+            scores, scored_version = model.predict(pending, weather, traffic, now).tolist(), model.version
+    except Exception as e:
+        print(f"ML prediction error: {e}")
+        return results, None
+    
+    for i, score in zip(active, scores):
+        results[i] = score
+        if cache is not None and score is not None and scored_version == version:
+            cache.put(keys[i], score)
+    return results, scored_version
+
+def predict_delay_julia(delivery, weather_risk=2, traffic_risk=2):
     """Predict delay probability using Julia ML model"""
+    return run_julia(delivery, weather_risk, traffic_risk)[0]
+
+def run_julia(delivery, weather_risk=2, traffic_risk=2):
+    """One `julia ml_model.jl` call; returns (probability, model version), (None, None) on failure"""
     try:
-        import os
-        # Get the directory of this script
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        julia_script = os.path.join(script_dir, 'ml_model.jl')
+        julia_script = os.path.join(SCRIPT_DIR, 'ml_model.jl')
         
         # Prepare data for Julia
         data = {
@@ -37,13 +352,15 @@ def predict_delay(delivery, weather_risk=2, traffic_risk=2):
             capture_output=True,
             text=True,
             timeout=5,
-            cwd=script_dir
+            cwd=SCRIPT_DIR
         )
         
         if result.returncode == 0:
-            return float(result.stdout.strip())
+            # Probability on the first line, model version on the second
+            lines = result.stdout.strip().splitlines()
+            return float(lines[0]), (lines[1].strip() if len(lines) > 1 else None)
         else:
-            return None
+            return None, None
     except Exception as e:
         print(f"ML prediction error: {e}")
-        return None
+        return None, None
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+
+# Checking mtime on every prediction would cost a stat call per chunk
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+def fingerprint(params, raw):
+    """'<version>-<sha256 prefix>' identifying one trained model file"""
+    return f"{params.get('version', 'v0')}-{hashlib.sha256(raw).hexdigest()[:12]}"
+
+
+def validate(params):
+    """Raise ValueError unless params hold five finite weights and a finite bias"""
+    weights = params.get('weights')
+    if not isinstance(weights, list) or len(weights) != 5:
+        raise ValueError("expected 5 weights")
+    for value in weights + [params.get('bias')]:
+        if not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"invalid parameter {value!r}")
+
+
+class ModelRegistry:
+    """Load a trained model once and hot-reload it when the file changes
+
+    factory(weights, bias, version) builds the model object. A new file only
+    replaces the current model after it parses and validates; until then
+    the previous model keeps serving predictions.
+    """
+
+    def __init__(self, path, factory, default_weights, default_bias, check_interval=DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.factory = factory
+        self.default_weights = default_weights
+        self.default_bias = default_bias
+        self.check_interval = check_interval
+        self.model = None
+        self.mtime = None
+        self.last_check = 0.0
+        self.lock = threading.Lock()
+
+    def _read(self):
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        params = json.loads(raw)
+        validate(params)
+        return self.factory(params['weights'], params['bias'], fingerprint(params, raw))
+
+    def _check(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+
+        if self.model is not None and mtime == self.mtime:
+            return
+        if mtime is None:
+            if self.model is None:
+                print(f"Warning: {self.path} not found, using default model weights")
+                self.model = self.factory(self.default_weights, self.default_bias, 'default')
+            return
+
+        try:
+            model = self._read()
+        except (OSError, ValueError, KeyError) as e:
+            if self.model is None:
+                print(f"Warning: could not load {self.path} ({e}), using default model weights")
+                self.model = self.factory(self.default_weights, self.default_bias, 'default')
+            else:
+                print(f"Warning: ignoring invalid model update in {self.path} ({e}), keeping {self.model.version}")
+            # Do not retry the same broken file until it changes again
+            self.mtime = mtime
+            return
+
+        if self.model is not None:
+            print(f"Reloaded model {model.version} (was {self.model.version})")
+        self.model = model
+        self.mtime = mtime
+
+    def current(self):
+        """The active model, reloading first if the file changed"""
+        with self.lock:
+            now = time.monotonic()
+            if self.model is None or now - self.last_check >= self.check_interval:
+                self.last_check = now
+                self._check()
+            return self.model
@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+
+# Time pressure drifts slowly, so predictions stay valid within one bucket
+DEFAULT_TIME_BUCKET = 15 * 60
+
+
+class PredictionCache:
+    """Bounded LRU cache of delay predictions
+
+    Keys cover everything the model reads: delivery state, risk factors,
+    model version and a coarse time bucket. Entries for a delivery can be
+    dropped when a chain event or risk edit touches it. Safe to share
+    between prediction worker threads.
+    """
+
+    def __init__(self, max_size=50000, time_bucket=DEFAULT_TIME_BUCKET):
+        self.max_size = max_size
+        self.time_bucket = time_bucket
+        self.entries = OrderedDict()
+        # delivery ID -> keys cached for it, for invalidation
+        self.keys_by_id = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def key(self, delivery, weather_risk, traffic_risk, model_version, now):
+        return (
+            delivery['id'],
+            delivery['status'],
+            delivery['current_lat'],
+            delivery['current_lon'],
+            delivery['expected_delivery_date'],
+            weather_risk,
+            traffic_risk,
+            model_version,
+            int(now // self.time_bucket)
+        )
+
+    def get(self, key):
+        """Cached prediction for key, or None"""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+
+    def put(self, key, value):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.entries[key] = value
+            self.keys_by_id.setdefault(key[0], set()).add(key)
+            while len(self.entries) > self.max_size:
+                old_key, _ = self.entries.popitem(last=False)
+                self._forget(old_key)
+
+    def _forget(self, key):
+        keys = self.keys_by_id.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.keys_by_id[key[0]]
+
+    def invalidate(self, delivery_id):
+        """Drop every cached prediction for delivery_id"""
+        with self.lock:
+            for key in self.keys_by_id.pop(delivery_id, ()):
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.keys_by_id.clear()
+
+    def __len__(self):
+        return len(self.entries)
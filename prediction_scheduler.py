@@ -0,0 +1,106 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from PySide6.QtCore import QThread, Signal
+
+from ml_predictor import ML_BACKEND, get_model, predict_delay_batch
+
+DEFAULT_WORKERS = int(os.environ.get('ML_WORKERS', os.cpu_count() or 4))
+
+
+class PredictionScheduler(QThread):
+    """Score deliveries on a worker pool without blocking the UI
+
+    Deliveries are split into jobs (one delivery each for the per-call Julia
+    backend, larger chunks otherwise) and run on up to `workers` threads.
+    A job still running after `timeout` seconds per delivery is reported as
+    failed. Results are posted back through the signals below.
+
+    The julia-server backend runs on one thread: its single Julia process
+    answers one request at a time, so more threads would only queue.
+    The thread finishes only after every job it started has returned, so
+    close_julia_worker() is safe once it has been waited on.
+    """
+
+    # [(delivery_id, probability or None, model version), ...]
+    scored = Signal(list)
+    # deliveries finished, total
+    progress = Signal(int, int)
+    # successes, failures, cancelled
+    done = Signal(int, int, bool)
+
+    def __init__(self, deliveries, risks, cache=None, workers=DEFAULT_WORKERS, timeout=10.0, chunk_size=None, parent=None):
+        super().__init__(parent)
+        self.deliveries = list(deliveries)
+        self.risks = risks
+        self.cache = cache
+        self.workers = 1 if ML_BACKEND == 'julia-server' else max(1, workers)
+        self.timeout = timeout
+        if chunk_size is None:
+            chunk_size = 1 if ML_BACKEND == 'julia' else 250
+        self.chunk_size = chunk_size
+        self._cancelled = False
+
+    def cancel(self):
+        """Stop after the jobs already running; queued jobs are dropped"""
+        self._cancelled = True
+
+    def _score(self, chunk, started):
+        started.append(time.monotonic())
+        # Scores come back tagged with the version of the model that produced
+        # them, which for the Julia backends is the one Julia loaded
+        return predict_delay_batch(chunk, self.risks, self.cache, get_model())
+
+    def run(self):
+        jobs = iter([self.deliveries[i:i + self.chunk_size]
+                     for i in range(0, len(self.deliveries), self.chunk_size)])
+        total = len(self.deliveries)
+        finished_count = success = fail = 0
+        running = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        def submit_next():
+            chunk = next(jobs, None)
+            if chunk is not None:
+                started = []
+                running[executor.submit(self._score, chunk, started)] = (chunk, started)
+
+        try:
+            # Keep every worker busy with one job queued behind it
+            for _ in range(self.workers * 2):
+                submit_next()
+
+            while running and not self._cancelled:
+                completed, _ = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                now = time.monotonic()
+                results = []
+                for future, (chunk, started) in list(running.items()):
+                    if future in completed:
+                        try:
+                            scores, version = future.result()
+                        except Exception as e:
+                            print(f"Error scoring deliveries: {e}")
+                            scores, version = [None] * len(chunk), ''
+                    elif started and now - started[0] > self.timeout * len(chunk):
+                        # Threads cannot be interrupted; the late result is ignored
+                        scores, version = [None] * len(chunk), ''
+                    else:
+                        continue
+                    del running[future]
+                    results.extend((d['id'], score, version) for d, score in zip(chunk, scores))
+                    submit_next()
+
+                if results:
+                    ok = sum(1 for _, score, _ in results if score is not None)
+                    success += ok
+                    fail += len(results) - ok
+                    finished_count += len(results)
+                    self.scored.emit(results)
+                    self.progress.emit(finished_count, total)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.done.emit(success, fail, self._cancelled)
+        # Timed-out jobs cannot be interrupted; they end within the backend's
+        # own timeout, and must not outlive this thread
+        executor.shutdown(wait=True)
@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+
+DEFAULT_RISK = (2, 2)
+
+
+def _replay(path, risks):
+    """Load the snapshot and journals into risks; returns the journal entry count"""
+    try:
+        with open(path, 'r') as f:
+            for delivery_id, risk in json.load(f).items():
+                risks[delivery_id] = (risk.get('weather', 2), risk.get('traffic', 2))
+    except (OSError, ValueError):
+        pass
+    entries = 0
+    # A journal left mid-compaction is older than the live one, so replay it first
+    for journal in (path + '.journal.compacting', path + '.journal'):
+        try:
+            with open(journal, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash during a flush
+                        continue
+                    risks[entry['id']] = (entry['weather'], entry['traffic'])
+                    entries += 1
+        except OSError:
+            pass
+    return entries
+
+
+def read_risks(path='risk_data.json'):
+    """Every stored (weather, traffic), keyed by delivery ID, read without a RiskStore
+
+    Nothing is written and no writer thread is started, so this is safe while
+    a dashboard owns the store.
+    """
+    risks = {}
+    _replay(path, risks)
+    return risks
+
+
+class RiskStore:
+    """Weather and traffic risk per delivery, held in memory
+
+    risk_data.json is the compacted snapshot. Edits are appended to a JSON
+    Lines journal by a background writer in batches, and once the journal
+    outgrows the snapshot it is folded back into risk_data.json, also in the
+    background. Lookups are plain dict reads.
+    """
+
+    def __init__(self, path='risk_data.json', flush_interval=1.0, compact_after=10000):
+        self.path = path
+        self.journal_path = path + '.journal'
+        self.flush_interval = flush_interval
+        self.compact_after = compact_after
+        self.risks = {}
+        self.pending = []
+        self.journal_entries = 0
+        self.lock = threading.Lock()
+        self.compacting = None
+        self._load()
+        if os.path.exists(self.journal_path + '.compacting'):
+            # Finish a compaction interrupted by a crash before rotating again
+            self._compact(dict(self.risks))
+        self._wake = threading.Event()
+        self._running = True
+        self._writer = threading.Thread(target=self._write_behind, daemon=True)
+        self._writer.start()
+
+    def _load(self):
+        self.journal_entries = _replay(self.path, self.risks)
+        # Cut a torn last line left by a crash, or the next append would be
+        # written onto it and lost as well
+        try:
+            with open(self.journal_path, 'rb+') as f:
+                data = f.read()
+                if data and not data.endswith(b'\n'):
+                    f.truncate(data.rfind(b'\n') + 1)
+        except OSError:
+            pass
+
+    def get(self, delivery_id, default=DEFAULT_RISK):
+        """(weather, traffic) for delivery_id"""
+        return self.risks.get(delivery_id, default)
+
+    def set(self, delivery_id, weather, traffic):
+        """Update a delivery's risk factors; the journal write happens in the background"""
+        with self.lock:
+            self.risks[delivery_id] = (weather, traffic)
+            self.pending.append({'id': delivery_id, 'weather': weather, 'traffic': traffic})
+
+    def snapshot(self):
+        """Copy of every stored (weather, traffic), keyed by delivery ID"""
+        return dict(self.risks)
+
+    def __len__(self):
+        return len(self.risks)
+
+    def __contains__(self, delivery_id):
+        return delivery_id in self.risks
+
+    def flush(self):
+        """Append pending edits to the journal"""
+        with self.lock:
+            if not self.pending:
+                return
+            with open(self.journal_path, 'a') as f:
+                f.write(''.join(json.dumps(entry) + "\n" for entry in self.pending))
+            self.journal_entries += len(self.pending)
+            self.pending = []
+            needs_compaction = (self.journal_entries > max(self.compact_after, len(self.risks))
+                                and self.compacting is None)
+            if needs_compaction:
+                # New edits go to a fresh journal while the old one is folded in
+                os.replace(self.journal_path, self.journal_path + '.compacting')
+                self.journal_entries = 0
+                self.compacting = threading.Thread(target=self._compact, args=(dict(self.risks),), daemon=True)
+                self.compacting.start()
+
+    def _compact(self, risks):
+        try:
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump({delivery_id: {'weather': weather, 'traffic': traffic}
+                           for delivery_id, (weather, traffic) in risks.items()}, f)
+            os.replace(tmp_path, self.path)
+            os.remove(self.journal_path + '.compacting')
+        except OSError as e:
+            print(f"Error compacting risk data: {e}")
+        finally:
+            with self.lock:
+                self.compacting = None
+
+    def _write_behind(self):
+        while self._running:
+            self._wake.wait(self.flush_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"Error saving risk data: {e}")
+
+    def close(self):
+        """Flush outstanding edits and wait for any compaction"""
+        self._running = False
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        compacting = self.compacting
+        if compacting is not None:
+            compacting.join()
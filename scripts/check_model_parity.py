@@ -0,0 +1,55 @@
+import sys
+import os
+import random
+import time
+
+# Add parent directory to path to import ml_predictor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ml_predictor import get_model, predict_delay_julia
+
+# Julia and NumPy read the clock a moment apart, so allow tiny drift
+TOLERANCE = 0.15
+
+def random_delivery(rng, now):
+    origin = (rng.uniform(25, 48), rng.uniform(-123, -70))
+    dest = (rng.uniform(25, 48), rng.uniform(-123, -70))
+    progress = rng.random()
+    return {
+        'id': 'P0000',
+        'origin_lat': origin[0], 'origin_lon': origin[1],
+        'dest_lat': dest[0], 'dest_lon': dest[1],
+        'current_lat': origin[0] + (dest[0] - origin[0]) * progress,
+        'current_lon': origin[1] + (dest[1] - origin[1]) * progress,
+        'status': 'In Transit',
+        'timestamp': int(now) - rng.randint(0, 5 * 86400),
+        'expected_delivery_date': int(now) + rng.randint(-3 * 86400, 10 * 86400),
+        'actual_delivery_date': 0
+    }
+
+def main(samples=25, seed=42):
+    """Compare NumPy scores with ml_model.jl, e.g. python scripts/check_model_parity.py
+    
+    pytest runs the same comparison in tests/test_model_parity.py.
+    """
+    rng = random.Random(seed)
+    model = get_model()
+    worst = 0.0
+    for _ in range(samples):
+        delivery = random_delivery(rng, time.time())
+        weather, traffic = rng.randint(1, 5), rng.randint(1, 5)
+        julia = predict_delay_julia(delivery, weather, traffic)
+        if julia is None:
+            print("✗ Julia prediction failed, is julia on PATH?")
+            return 1
+        numpy_score = float(model.predict([delivery], weather, traffic)[0])
+        worst = max(worst, abs(julia - numpy_score))
+        print(f"  weather={weather} traffic={traffic}  julia={julia:5.1f}  numpy={numpy_score:5.1f}")
+    
+    if worst > TOLERANCE:
+        print(f"✗ Max difference {worst:.2f} exceeds {TOLERANCE}")
+        return 1
+    print(f"✓ NumPy matches Julia on {samples} deliveries (max difference {worst:.2f})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,233 @@
 import sys
 import os
+
+# Add parent directory to path to import blockchain_helper
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import time
+from startup_timing import StartupTimer
+# Start of startup timing when this module is the entry point, taken before
+# its PySide6 import; run_dashboard.py passes an earlier clock of its own
+STARTUP_CLOCK = time.perf_counter()
+
+import math
 import webbrowser
-import folium
-import json
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                               QHBoxLayout, QTableWidget, QTableWidgetItem, QPushButton,
+                               QHBoxLayout, QTableView, QHeaderView, QPushButton,
                                QLabel, QLineEdit, QComboBox, QGroupBox, QMessageBox,
-                               QTabWidget, QTextEdit)
-from PySide6.QtCore import Qt
+                               QTabWidget, QTextEdit, QProgressBar, QSpinBox)
+from PySide6.QtCore import Qt, QTimer, QThread, Signal
 from PySide6.QtGui import QFont
 
-# Add parent directory to path to import blockchain_helper
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from blockchain_helper import BlockchainManager
-from ml_predictor import predict_delay
-import matplotlib
-matplotlib.use('Qt5Agg')
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
+from ml_predictor import ML_BACKEND, predict_delay_batch, close_julia_worker
+from delivery_snapshot import DeliverySnapshot
+from delivery_mirror import DeliveryMirror
+from tx_queue import TransactionQueue
+from prediction_cache import PredictionCache
+from prediction_scheduler import PredictionScheduler, DEFAULT_WORKERS
+from risk_store import RiskStore
+from delivery_table_model import DeliveryTableModel, ButtonDelegate, EDIT_COLUMN, HISTORY_COLUMN
+from map_builder import write_clustered_map, STATUS_COLORS
+from live_map import LiveMapView
+# brownie (via blockchain_helper), folium, matplotlib and QtWebEngine are
+# imported lazily so the window can paint before they load
+
+# Minimum time between chart redraws during live updates
+CHART_REDRAW_MS = 500
+# How long closing the window waits for a connection attempt in progress
+CONNECT_WAIT_MS = 5000
+MAP_MODE_CLUSTERED = "Clustered (GeoJSON)"
+MAP_MODE_DETAILED = "Detailed (all routes)"
+
+class HistoryPager:
+    """Fill a QListWidget with history entries newest first
+    
+    A page is fetched per scroll to the bottom or per click on more_button,
+    which the dialog places under the list; the button also reaches older
+    entries when the first page fits without a scrollbar.
+    """
+    
+    def __init__(self, list_widget, total, fetch_range, format_entry, empty_text, page_size=50):
+        self.list_widget = list_widget
+        self.total = total
+        self.fetch_range = fetch_range
+        self.format_entry = format_entry
+        self.page_size = page_size
+        self.loaded = 0
+        self.more_button = QPushButton()
+        self.more_button.clicked.connect(self.load_next_page)
+        
+        if total == 0:
+            list_widget.addItem(empty_text)
+            self.more_button.hide()
+            return
+        list_widget.verticalScrollBar().valueChanged.connect(self.on_scroll)
+        self.load_next_page()
+    
+    def load_next_page(self):
+        """Fetch the next older page; entries are stored oldest first on chain"""
+        remaining = self.total - self.loaded
+        if remaining <= 0:
+            return
+        count = min(self.page_size, remaining)
+        entries = self.fetch_range(remaining - count, count)
+        for entry in reversed(entries):
+            self.list_widget.addItem(self.format_entry(entry))
+        self.loaded += count
+        
+        remaining = self.total - self.loaded
+        self.more_button.setText(f"Load older entries ({remaining} more)")
+        self.more_button.setVisible(remaining > 0)
+    
+    def on_scroll(self, value):
+        if value >= self.list_widget.verticalScrollBar().maximum() - 2:
+            self.load_next_page()
+
+class ConnectWorker(QThread):
+    """Connect to the chain and catch the mirror up off the UI thread
+    
+    A new contract (or no mirror) is reported as a full load, which the
+    dashboard hands to DeliveryLoader.
+    """
+    
+    # message, done, total (total 0 = busy indicator)
+    progress = Signal(str, int, int)
+    # BlockchainManager, result dict
+    connected = Signal(object, object)
+    error = Signal(str)
+    
+    def __init__(self, mirror_address, mirror_block, parent=None):
+        super().__init__(parent)
+        self.mirror_address = mirror_address
+        self.mirror_block = mirror_block
+    
+    def run(self):
+        try:
+            self.progress.emit("Loading blockchain libraries...", 0, 0)
+            from blockchain_helper import BlockchainManager
+            
+            self.progress.emit("Connecting to blockchain...", 0, 0)
+            bc = BlockchainManager()
+            
+            # Catch up from the mirror's block, or do a full load for a new contract
+            if (self.mirror_address == bc.contract.address
+                    and self.mirror_block is not None and self.mirror_block <= bc.last_block):
+                self.progress.emit(f"Catching up from block {self.mirror_block}...", 0, 0)
+                bc.last_block = self.mirror_block
+                events, deliveries, to_block = bc.poll_changed_deliveries()
+                result = {'full': False, 'deliveries': deliveries, 'events': events, 'to_block': to_block}
+            else:
+                result = {'full': True}
+            
+            self.connected.emit(bc, result)
+        except Exception as e:
+            self.error.emit(str(e))
+
+class DeliveryLoader(QThread):
+    """Read every delivery in pages off the UI thread, emitting each page as a row batch
+    
+    Every signal carries the loader's generation so results from a cancelled
+    load can be told apart from the one that replaced it.
+    """
+    
+    # generation, deliveries in this page
+    batch = Signal(int, list)
+    # generation, every event up to bc.last_block (only with with_history)
+    history = Signal(int, list)
+    # generation, loaded, total
+    progress = Signal(int, int, int)
+    # generation, cancelled
+    done = Signal(int, bool)
+    # generation, message
+    error = Signal(int, str)
+    
+    def __init__(self, bc, generation, page_size=500, with_history=False, parent=None):
+        super().__init__(parent)
+        self.bc = bc
+        self.generation = generation
+        self.page_size = page_size
+        self.with_history = with_history
+        self._cancelled = False
+    
+    def cancel(self):
+        self._cancelled = True
+    
+    def run(self):
+        try:
+            total = self.bc.get_delivery_count()
+            loaded = 0
+            page = []
+            for delivery in self.bc.iter_deliveries(self.page_size):
+                if self._cancelled:
+                    break
+                page.append(delivery)
+                if len(page) == self.page_size:
+                    loaded += len(page)
+                    self.batch.emit(self.generation, page)
+                    self.progress.emit(self.generation, loaded, total)
+                    page = []
+            if page and not self._cancelled:
+                loaded += len(page)
+                self.batch.emit(self.generation, page)
+                self.progress.emit(self.generation, loaded, total)
+            if self.with_history and not self._cancelled:
+                # Event polling is paused during a load, so last_block is stable
+                events, _ = self.bc.get_events(0, self.bc.last_block)
+                self.history.emit(self.generation, events)
+            self.done.emit(self.generation, self._cancelled)
+        except Exception as e:
+            self.error.emit(self.generation, str(e))
 
 class SupplyChainDashboard(QMainWindow):
-    def __init__(self):
+    def __init__(self, startup_clock=None):
         super().__init__()
+        self.timer = StartupTimer(STARTUP_CLOCK if startup_clock is None else startup_clock)
+        self.timer.mark("imports")
         self.bc = None
+        self.connect_worker = None
+        self.loader = None
+        self.loader_generation = 0
+        # True from the start of a load until its rows are in the snapshot
+        self.loading = False
+        # Generate Interactive Map was pressed before any deliveries were loaded
+        self.map_after_load = False
+        self.loaded_deliveries = []
+        self.loaded_events = []
+        self.snapshot = DeliverySnapshot()
+        # Poll contract events and apply only the changed rows
+        self.sync_timer = QTimer(self)
+        self.sync_timer.setInterval(2000)
+        self.sync_timer.timeout.connect(self.sync_changes)
+        self.mirror = DeliveryMirror()
+        self.tx_queue = None
+        # Which log widget each queued transaction reports to
+        self.tx_logs = {}
+        self.prediction_scheduler = None
+        self.prediction_cache = PredictionCache()
+        # Risk factors stay in memory; edits reach risk_data.json in the background
+        self.risk_store = RiskStore()
+        # Chart refreshes are coalesced into at most one redraw per interval
+        self.chart_timer = QTimer(self)
+        self.chart_timer.setSingleShot(True)
+        self.chart_timer.setInterval(CHART_REDRAW_MS)
+        self.chart_timer.timeout.connect(self.render_charts)
+        self.pie_artists = None
+        self.bar_artists = None
+        self.drawn_status_counts = None
+        self.drawn_performance = None
         self.init_ui()
+        self.timer.mark("window built")
+        # Show the last mirrored state right away, then catch up from the chain
+        self.load_mirror()
+        self.timer.mark("mirror shown")
+        # Heavy work starts once the window has painted
+        QTimer.singleShot(0, self.finish_startup)
+    
+    def finish_startup(self):
+        """Second startup stage, run after the first paint"""
+        self.timer.mark("first paint")
         self.connect_blockchain()
+        self.init_charts()
+        self.timer.mark("charts ready")
     
     def init_ui(self):
         self.setWindowTitle("Supply Chain Tracking Dashboard - Blockchain Enabled")
@@ -51,7 +253,11 @@ class SupplyChainDashboard(QMainWindow):
         
 
         
-        # Status bar
+        # Status bar with progress for background loading
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumWidth(200)
+        self.progress_bar.hide()
+        self.statusBar().addPermanentWidget(self.progress_bar)
         self.statusBar().showMessage("Ready")
     
     def create_header(self):
@@ -98,9 +304,10 @@ class SupplyChainDashboard(QMainWindow):
         chart_label.setFont(QFont("Arial", 16, QFont.Bold))
         left_layout.addWidget(chart_label)
         
-        self.pie_figure = Figure(figsize=(4, 3))
-        self.pie_canvas = FigureCanvas(self.pie_figure)
-        left_layout.addWidget(self.pie_canvas)
+        # Figures are created by init_charts once matplotlib is loaded
+        self.pie_figure = None
+        self.pie_layout = QVBoxLayout()
+        left_layout.addLayout(self.pie_layout, 1)
         
         # Performance chart
         bar_label = QLabel("On-Time Performance")
@@ -108,9 +315,9 @@ class SupplyChainDashboard(QMainWindow):
         bar_label.setFont(QFont("Arial", 16, QFont.Bold))
         left_layout.addWidget(bar_label)
         
-        self.bar_figure = Figure(figsize=(4, 3))
-        self.bar_canvas = FigureCanvas(self.bar_figure)
-        left_layout.addWidget(self.bar_canvas)
+        self.bar_figure = None
+        self.bar_layout = QVBoxLayout()
+        left_layout.addLayout(self.bar_layout, 1)
         
         refresh_chart_btn = QPushButton("Refresh Charts")
         refresh_chart_btn.clicked.connect(self.update_charts)
@@ -136,7 +343,7 @@ class SupplyChainDashboard(QMainWindow):
         search_layout = QHBoxLayout()
         search_layout.addWidget(QLabel("Delivery ID:"))
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("e.g., D0001")
+        self.search_input.setPlaceholderText("e.g., D0001 or D0001, D0002")
         search_layout.addWidget(self.search_input)
         
         search_btn = QPushButton("Search")
@@ -161,17 +368,23 @@ class SupplyChainDashboard(QMainWindow):
         column_layout.addStretch()
         right_layout.addLayout(column_layout)
         
-        # Table
-        self.delivery_table = QTableWidget()
-        self.delivery_table.setColumnCount(15)
-        self.delivery_table.setHorizontalHeaderLabels([
-            "ID", "Delay Risk %", "Status", "On-Time Status", "Origin Lat", "Origin Lon", 
-            "Dest Lat", "Dest Lon", "Current Lat", "Current Lon", 
-            "Timestamp", "Expected Date", "Actual Date", "Edit", "History"
-        ])
-        self.delivery_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        # Table: a model over delivery dicts, formatted only for visible rows
+        self.delivery_model = DeliveryTableModel(self)
+        self.delivery_table = QTableView()
+        self.delivery_table.setModel(self.delivery_model)
+        self.delivery_table.setEditTriggers(QTableView.NoEditTriggers)
         self.delivery_table.setSortingEnabled(True)
         self.delivery_table.horizontalHeader().setStretchLastSection(True)
+        # Fixed row heights keep layout independent of the row count
+        self.delivery_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        
+        # Edit and View History are painted by delegates instead of a widget per row
+        edit_delegate = ButtonDelegate("Edit", "#FF9800", self.delivery_table)
+        edit_delegate.clicked.connect(lambda row: self.show_edit_dialog(self.delivery_model.delivery_id(row)))
+        self.delivery_table.setItemDelegateForColumn(EDIT_COLUMN, edit_delegate)
+        history_delegate = ButtonDelegate("View History", "#2196F3", self.delivery_table)
+        history_delegate.clicked.connect(lambda row: self.view_delivery_history(self.delivery_model.delivery_id(row)))
+        self.delivery_table.setItemDelegateForColumn(HISTORY_COLUMN, history_delegate)
         
         # Hide coordinate columns by default
         self.delivery_table.setColumnHidden(4, True)  # Origin Lat
@@ -357,47 +570,76 @@ class SupplyChainDashboard(QMainWindow):
         widget.setLayout(layout)
         return widget
     
-    def load_risk_data(self):
-        """Load risk data from JSON file"""
-        try:
-            with open('risk_data.json', 'r') as f:
-                return json.load(f)
-        except:
-            return {}
-    
-    def save_risk_data(self, data):
-        """Save risk data to JSON file"""
-        with open('risk_data.json', 'w') as f:
-            json.dump(data, f, indent=2)
-    
     def get_risk_values(self, delivery_id):
         """Get weather and traffic risk for a delivery"""
-        risk_data = self.load_risk_data()
-        if delivery_id in risk_data:
-            return risk_data[delivery_id].get('weather', 2), risk_data[delivery_id].get('traffic', 2)
-        return 2, 2
+        return self.risk_store.get(delivery_id)
     
     def connect_blockchain(self):
-        """Connect to blockchain"""
+        """Connect to blockchain and load deliveries in a background worker"""
+        if self.connect_worker and self.connect_worker.isRunning():
+            return
+        
+        self.blockchain_status.setText("🟡 Blockchain: Connecting...")
+        self.blockchain_status.setStyleSheet("color: orange;")
+        self.connect_worker = ConnectWorker(self.mirror.contract_address, self.mirror.block, self)
+        self.connect_worker.progress.connect(self.on_load_progress)
+        self.connect_worker.connected.connect(self.on_blockchain_connected)
+        self.connect_worker.error.connect(self.on_blockchain_error)
+        self.connect_worker.start()
+    
+    def on_load_progress(self, message, done, total):
+        """Show background loading progress in the status bar"""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.show()
+        self.statusBar().showMessage(f"{message} {done}/{total}" if total else message)
+    
+    def on_blockchain_connected(self, bc, result):
+        """Apply the worker's initial load on the UI thread"""
+        self.bc = bc
+        self.timer.mark("blockchain connected")
+        self.blockchain_status.setText("🟢 Blockchain: Connected")
+        self.blockchain_status.setStyleSheet("color: green;")
+        self.contract_label.setText(f"Contract: {self.bc.contract.address[:10]}...")
+        self.statusBar().showMessage("Connected to blockchain")
+        self.start_tx_queue()
+        
+        self.progress_bar.hide()
+        if result['full']:
+            # Rows arrive page by page; startup timing is reported when the load finishes
+            self.mirror.reset(self.bc.contract.address)
+            self.start_loader(with_history=True)
+            return
+        
+        self.apply_changes(result['events'], result['deliveries'], result['to_block'])
+        self.sync_timer.start()
+        self.timer.mark("initial load done")
+        self.report_startup_timing()
+    
+    def on_blockchain_error(self, message):
+        self.progress_bar.hide()
+        self.blockchain_status.setText("🔴 Blockchain: Disconnected")
+        self.blockchain_status.setStyleSheet("color: red;")
+        if "contract_address.txt" not in message:
+            QMessageBox.warning(self, "Connection Error", 
+                              f"Failed to connect to blockchain:\n{message}\n\nMake sure Ganache is running!")
+        self.report_startup_timing()
+    
+    def report_startup_timing(self):
+        """Print and record startup milestones once per launch"""
+        if self.timer is None:
+            return
+        print(self.timer.report())
         try:
-            self.bc = BlockchainManager()
-            self.blockchain_status.setText("🟢 Blockchain: Connected")
-            self.blockchain_status.setStyleSheet("color: green;")
-            self.contract_label.setText(f"Contract: {self.bc.contract.address[:10]}...")
-            self.statusBar().showMessage("Connected to blockchain")
-            # Auto-load deliveries and charts
-            self.load_all_deliveries()
-        except Exception as e:
-            self.blockchain_status.setText("🔴 Blockchain: Disconnected")
-            self.blockchain_status.setStyleSheet("color: red;")
-            if "contract_address.txt" not in str(e):
-                QMessageBox.warning(self, "Connection Error", 
-                                  f"Failed to connect to blockchain:\n{str(e)}\n\nMake sure Ganache is running!")
+            self.timer.save()
+        except OSError as e:
+            print(f"Could not save startup timing: {e}")
+        self.timer = None
     
     def search_delivery(self):
-        """Search for a specific delivery"""
-        delivery_id = self.search_input.text().strip()
-        if not delivery_id:
+        """Search for one or more comma-separated deliveries"""
+        delivery_ids = [d.strip() for d in self.search_input.text().split(',') if d.strip()]
+        if not delivery_ids:
             QMessageBox.warning(self, "Input Error", "Please enter a Delivery ID")
             return
         
@@ -406,144 +648,175 @@ class SupplyChainDashboard(QMainWindow):
             return
         
         try:
-            delivery = self.bc.get_delivery(delivery_id)
-            if not delivery['id'] or delivery['id'] == '':
-                QMessageBox.warning(self, "Not Found", f"Delivery '{delivery_id}' does not exist on the blockchain.")
-                return
-            self.delivery_table.setRowCount(1)
-            self.populate_table_row(0, delivery)
-            self.statusBar().showMessage(f"Found delivery: {delivery_id}")
+            deliveries = self.bc.get_deliveries(delivery_ids)
         except Exception as e:
-            QMessageBox.warning(self, "Not Found", f"Delivery '{delivery_id}' does not exist on the blockchain.")
+            QMessageBox.warning(self, "Error", f"Failed to search deliveries:\n{str(e)}")
+            return
+        
+        found = [d for d in deliveries if d['id']]
+        missing = [d_id for d_id, d in zip(delivery_ids, deliveries) if not d['id']]
+        if not found:
+            QMessageBox.warning(self, "Not Found", f"Delivery '{', '.join(missing)}' does not exist on the blockchain.")
+            return
+        
+        self.delivery_model.set_deliveries(found)
+        
+        if missing:
+            self.statusBar().showMessage(f"Found {len(found)} deliveries, not found: {', '.join(missing)}")
+        else:
+            self.statusBar().showMessage(f"Found delivery: {', '.join(d['id'] for d in found)}")
+    
+    def load_mirror(self):
+        """Show deliveries from the local mirror without touching the chain"""
+        self.snapshot.load(self.mirror.load_deliveries())
+        self.show_snapshot()
+        if len(self.snapshot):
+            self.statusBar().showMessage(f"Showing {len(self.snapshot)} mirrored deliveries (block {self.mirror.block}), syncing...")
     
-    def load_deliveries(self):
-        """Load first 10 deliveries"""
+    def load_all_deliveries(self):
+        """Reload all deliveries in the background, filling the table page by page
+        
+        Pressing Load All again cancels the running load and starts over.
+        """
         if not self.bc:
             QMessageBox.warning(self, "Connection Error", "Not connected to blockchain")
             return
+        self.start_loader()
+    
+    def start_loader(self, with_history=False):
+        """Start a background load, replacing any running one
+        
+        Event polling, including the syncs triggered by confirmed
+        transactions, waits until the load is in the snapshot; it then
+        resumes from the same block, so nothing is lost and no newer row is
+        overwritten by an older page. with_history also fetches every event
+        for the mirror's history tables.
+        """
+        self.cancel_loader()
+        self.sync_timer.stop()
+        self.loader_generation += 1
+        self.loading = True
+        self.loaded_deliveries = []
+        self.loaded_events = []
+        self.delivery_model.clear()
+        self.delivery_count_badge.setText("📦 Deliveries: loading...")
+        
+        self.loader = DeliveryLoader(self.bc, self.loader_generation, with_history=with_history, parent=self)
+        self.loader.batch.connect(self.on_loader_batch)
+        self.loader.history.connect(self.on_loader_history)
+        self.loader.progress.connect(self.on_loader_progress)
+        self.loader.done.connect(self.on_loader_done)
+        self.loader.error.connect(self.on_loader_error)
+        self.loader.start()
+    
+    def cancel_loader(self):
+        """Stop a running background load; its remaining signals are ignored"""
+        if self.loader and self.loader.isRunning():
+            self.loader.cancel()
+        self.loader_generation += 1
+        self.loading = False
+    
+    def on_loader_batch(self, generation, deliveries):
+        if generation != self.loader_generation:
+            return
+        self.loaded_deliveries.extend(deliveries)
+        self.delivery_model.append(deliveries)
+    
+    def on_loader_history(self, generation, events):
+        if generation != self.loader_generation:
+            return
+        self.loaded_events = events
+    
+    def on_loader_progress(self, generation, loaded, total):
+        if generation != self.loader_generation:
+            return
+        self.delivery_count_badge.setText(f"📦 Deliveries: {loaded}/{total}")
+        self.statusBar().showMessage(f"Loading deliveries... {loaded}/{total}")
+    
+    def on_loader_done(self, generation, cancelled):
+        if generation != self.loader_generation or cancelled:
+            return
+        # Single chain scan shared by the table, badge and charts
+        self.loading = False
+        self.snapshot.load(self.loaded_deliveries)
+        self.mirror.apply(self.loaded_deliveries, self.loaded_events, self.bc.last_block)
+        self.loaded_deliveries = []
+        self.loaded_events = []
+        self.live_map.set_deliveries(self.snapshot.values())
         
-        self.delivery_table.setRowCount(0)
-        for i in range(1, 11):
-            delivery_id = f'D{i:04d}'
-            try:
-                delivery = self.bc.get_delivery(delivery_id)
-                row = self.delivery_table.rowCount()
-                self.delivery_table.insertRow(row)
-                self.populate_table_row(row, delivery)
-            except:
-                pass
-        
-        self.statusBar().showMessage("Loaded first 10 deliveries from blockchain")
         self.update_delivery_count()
         self.update_charts()
+        self.statusBar().showMessage(f"Loaded {len(self.snapshot)} deliveries from blockchain")
+        if self.timer is not None:
+            self.timer.mark("initial load done")
+            self.report_startup_timing()
+        # Apply whatever changed during the load, then resume polling
+        self.sync_changes()
+        self.sync_timer.start()
+        if self.map_after_load:
+            self.map_after_load = False
+            self.open_map()
     
-    def load_all_deliveries(self):
-        """Load all deliveries"""
-        if not self.bc:
-            QMessageBox.warning(self, "Connection Error", "Not connected to blockchain")
+    def on_loader_error(self, generation, message):
+        if generation != self.loader_generation:
+            return
+        self.loading = False
+        self.loaded_deliveries = []
+        self.loaded_events = []
+        if self.map_after_load:
+            self.map_after_load = False
+            self.map_status.setText("Map: Not generated")
+        # Fall back to what the snapshot already holds
+        self.show_snapshot()
+        self.report_startup_timing()
+        self.sync_changes()
+        self.sync_timer.start()
+        QMessageBox.warning(self, "Error", f"Failed to load deliveries:\n{message}")
+    
+    def show_snapshot(self):
+        """Fill the table, badge, charts and map from the snapshot"""
+        self.delivery_model.set_deliveries(self.snapshot.values())
+        self.live_map.set_deliveries(self.snapshot.values())
+        self.update_delivery_count()
+        self.update_charts()
+    
+    def sync_changes(self):
+        """Apply deliveries touched by contract events since the last poll"""
+        if not self.bc or self.loading:
+            # A running load would overwrite the rows; on_loader_done syncs after it
+            return
+        
+        try:
+            events, deliveries, to_block = self.bc.poll_changed_deliveries()
+        except Exception as e:
+            print(f"Error syncing blockchain changes: {e}")
+            return
+        self.apply_changes(events, deliveries, to_block)
+    
+    def apply_changes(self, events, deliveries, to_block):
+        """Update the mirror, snapshot, map and only the affected table rows
+        
+        The chain cursor moves past to_block only once the mirror write has
+        succeeded, so a failed batch is polled again.
+        """
+        if not events:
+            self.bc.commit_cursor(to_block)
             return
         
-        self.delivery_table.setRowCount(0)
-        count = 0
-        empty_count = 0
-        i = 1
+        self.mirror.apply(deliveries, events, to_block)
+        self.bc.commit_cursor(to_block)
+        for event in events:
+            self.prediction_cache.invalidate(event['id'])
         
-        # Stop after finding 50 consecutive empty IDs
-        while empty_count < 50 and i < 10000:
-            delivery_id = f'D{i:04d}'
-            try:
-                delivery = self.bc.get_delivery(delivery_id)
-                if delivery['id']:
-                    row = self.delivery_table.rowCount()
-                    self.delivery_table.insertRow(row)
-                    self.populate_table_row(row, delivery)
-                    count += 1
-                    empty_count = 0
-                else:
-                    empty_count += 1
-            except:
-                empty_count += 1
-            i += 1
+        for delivery in deliveries:
+            self.snapshot.put(delivery)
+        self.delivery_model.upsert(deliveries)
+        self.live_map.update_deliveries(deliveries)
         
-        self.statusBar().showMessage(f"Loaded {count} deliveries from blockchain")
+        self.statusBar().showMessage(f"Synced {len(deliveries)} changed deliveries")
         self.update_delivery_count()
         self.update_charts()
     
-    def populate_table_row(self, row, delivery):
-        """Populate a table row with delivery data"""
-        from PySide6.QtGui import QColor
-        from datetime import datetime
-        
-        self.delivery_table.setItem(row, 0, QTableWidgetItem(delivery['id']))
-        
-        # Delay Risk - initially empty
-        self.delivery_table.setItem(row, 1, QTableWidgetItem("-"))
-        
-        # Color-coded status
-        status_item = QTableWidgetItem(delivery['status'])
-        color_map = {
-            'In Transit': QColor(0, 0, 139),
-            'Delivered': QColor(0, 100, 0),
-            'Delayed': QColor(220, 20, 60),
-            'Preparing for Shipment': QColor(255, 140, 0)
-        }
-        if delivery['status'] in color_map:
-            status_item.setBackground(color_map[delivery['status']])
-        self.delivery_table.setItem(row, 2, status_item)
-        
-        # On-Time Status
-        import time as time_module
-        current_time = int(time_module.time())
-        expected = delivery['expected_delivery_date']
-        actual = delivery['actual_delivery_date']
-        
-        if delivery['status'] == 'Delivered':
-            if actual > 0 and actual <= expected:
-                on_time_status = 'On-Time'
-                on_time_color = QColor(0, 100, 0)
-            else:
-                on_time_status = 'Late'
-                on_time_color = QColor(220, 20, 60)
-        else:
-            if current_time > expected:
-                on_time_status = 'At Risk'
-                on_time_color = QColor(220, 20, 60)
-            else:
-                on_time_status = 'On Track'
-                on_time_color = QColor(0, 0, 139)
-        
-        on_time_item = QTableWidgetItem(on_time_status)
-        on_time_item.setBackground(on_time_color)
-        self.delivery_table.setItem(row, 3, on_time_item)
-        
-        self.delivery_table.setItem(row, 4, QTableWidgetItem(f"{delivery['origin_lat']:.4f}"))
-        self.delivery_table.setItem(row, 5, QTableWidgetItem(f"{delivery['origin_lon']:.4f}"))
-        self.delivery_table.setItem(row, 6, QTableWidgetItem(f"{delivery['dest_lat']:.4f}"))
-        self.delivery_table.setItem(row, 7, QTableWidgetItem(f"{delivery['dest_lon']:.4f}"))
-        self.delivery_table.setItem(row, 8, QTableWidgetItem(f"{delivery['current_lat']:.4f}"))
-        self.delivery_table.setItem(row, 9, QTableWidgetItem(f"{delivery['current_lon']:.4f}"))
-        self.delivery_table.setItem(row, 10, QTableWidgetItem(str(delivery['timestamp'])))
-        
-        # Expected delivery date
-        expected_str = datetime.fromtimestamp(delivery['expected_delivery_date']).strftime('%Y-%m-%d %H:%M') if delivery['expected_delivery_date'] > 0 else 'N/A'
-        self.delivery_table.setItem(row, 11, QTableWidgetItem(expected_str))
-        
-        # Actual delivery date
-        actual_str = datetime.fromtimestamp(delivery['actual_delivery_date']).strftime('%Y-%m-%d %H:%M') if delivery['actual_delivery_date'] > 0 else 'N/A'
-        self.delivery_table.setItem(row, 12, QTableWidgetItem(actual_str))
-        
-        # Edit button
-        edit_btn = QPushButton("Edit")
-        edit_btn.setStyleSheet("background-color: #FF9800; color: white; padding: 5px;")
-        edit_btn.clicked.connect(lambda checked, d_id=delivery['id']: self.show_edit_dialog(d_id))
-        self.delivery_table.setCellWidget(row, 13, edit_btn)
-        
-        # View History button
-        history_btn = QPushButton("View History")
-        history_btn.setStyleSheet("background-color: #2196F3; color: white; padding: 5px;")
-        history_btn.clicked.connect(lambda checked, d_id=delivery['id']: self.view_delivery_history(d_id))
-        self.delivery_table.setCellWidget(row, 14, history_btn)
-    
     def add_delivery(self):
         """Add new delivery to blockchain"""
         if not self.bc:
@@ -570,24 +843,14 @@ class SupplyChainDashboard(QMainWindow):
             if not delivery_id:
                 raise ValueError("Delivery ID is required")
             
-            self.add_log.append(f"Adding {delivery_id} to blockchain...")
-            tx = self.bc.add_delivery(delivery_id, origin_lat, origin_lon, dest_lat, 
-                                     dest_lon, status, current_lat, current_lon, expected_date)
-            
-            self.add_log.append(f"✓ Success! Transaction: {tx.txid}")
-            self.add_log.append(f"  Status: {status}")
-            self.add_log.append(f"  Expected in {days} days")
-            self.add_log.append("-" * 50)
-            
-            QMessageBox.information(self, "Success", f"Delivery {delivery_id} added to blockchain!")
-            self.clear_add_form()
-            self.load_deliveries()
+            if self.queue_transaction(self.add_log, f"Add {delivery_id}", self.bc.add_delivery,
+                                      delivery_id, origin_lat, origin_lon, dest_lat, 
+                                      dest_lon, status, current_lat, current_lon, expected_date):
+                self.add_log.append(f"Queued {delivery_id} ({status}, expected in {days} days)")
+                self.clear_add_form()
             
         except ValueError as e:
             QMessageBox.warning(self, "Input Error", f"Invalid input:\n{str(e)}")
-        except Exception as e:
-            self.add_log.append(f"✗ Error: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Failed to add delivery:\n{str(e)}")
     
     def update_status(self):
         """Update delivery status"""
@@ -611,21 +874,12 @@ class SupplyChainDashboard(QMainWindow):
                     QMessageBox.warning(self, "Required", "Delay reason is required")
                     return
             
-            self.update_log.append(f"Updating status for {delivery_id}...")
-            tx = self.bc.update_status(delivery_id, new_status, reason)
-            
-            self.update_log.append(f"✓ Status updated to: {new_status}")
-            if reason:
-                self.update_log.append(f"  Reason: {reason}")
-            self.update_log.append(f"  Transaction: {tx.txid}")
-            self.update_log.append("-" * 50)
+            if self.queue_transaction(self.update_log, f"Status {delivery_id} -> {new_status}",
+                                      self.bc.update_status, delivery_id, new_status, reason):
+                self.update_log.append(f"Queued status {new_status} for {delivery_id}" + (f" (Reason: {reason})" if reason else ""))
             
-            QMessageBox.information(self, "Success", f"Status updated to: {new_status}")
-            self.load_deliveries()
-            
-        except Exception as e:
-            self.update_log.append(f"✗ Error: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Failed to update status:\n{str(e)}")
+        except ValueError as e:
+            QMessageBox.warning(self, "Input Error", f"Invalid input:\n{str(e)}")
     
     def update_location(self):
         """Update delivery location"""
@@ -641,21 +895,53 @@ class SupplyChainDashboard(QMainWindow):
             if not delivery_id:
                 raise ValueError("Delivery ID is required")
             
-            self.update_log.append(f"Updating location for {delivery_id}...")
-            tx = self.bc.update_location(delivery_id, lat, lon)
-            
-            self.update_log.append(f"✓ Location updated to: ({lat}, {lon})")
-            self.update_log.append(f"  Transaction: {tx.txid}")
-            self.update_log.append("-" * 50)
-            
-            QMessageBox.information(self, "Success", f"Location updated!")
-            self.load_deliveries()
+            if self.queue_transaction(self.update_log, f"Location {delivery_id} -> ({lat}, {lon})",
+                                      self.bc.update_location, delivery_id, lat, lon):
+                self.update_log.append(f"Queued location ({lat}, {lon}) for {delivery_id}")
             
         except ValueError as e:
             QMessageBox.warning(self, "Input Error", f"Invalid input:\n{str(e)}")
-        except Exception as e:
-            self.update_log.append(f"✗ Error: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Failed to update location:\n{str(e)}")
+    
+    def start_tx_queue(self):
+        """(Re)start the background transaction queue for the current connection"""
+        if self.tx_queue:
+            self.tx_queue.stop()
+        self.tx_queue = TransactionQueue(self.bc)
+        self.tx_queue.submitted.connect(self.on_tx_submitted)
+        self.tx_queue.confirmed.connect(self.on_tx_confirmed)
+        self.tx_queue.failed.connect(self.on_tx_failed)
+        self.tx_queue.start()
+    
+    def queue_transaction(self, log, label, method, *args):
+        """Send a write through the transaction queue and stream its state to log
+        
+        Returns False, after warning, when there is no queue (not connected
+        yet, or the chain was just wiped).
+        """
+        if not self.tx_queue:
+            QMessageBox.warning(self, "Connection Error", "Not connected to blockchain")
+            return False
+        job_id = self.tx_queue.enqueue(label, method, *args)
+        self.tx_logs[job_id] = log
+        self.statusBar().showMessage(f"{self.tx_queue.pending_count()} transactions pending")
+        return True
+    
+    def on_tx_submitted(self, job_id, label, txid):
+        self.tx_logs.get(job_id, self.update_log).append(f"… Submitted {label}: {txid}")
+    
+    def on_tx_confirmed(self, job_id, label, txid):
+        log = self.tx_logs.pop(job_id, self.update_log)
+        log.append(f"✓ Confirmed {label}: {txid}")
+        self.statusBar().showMessage(f"Confirmed {label} ({self.tx_queue.pending_count()} pending)")
+        self.sync_changes()
+    
+    def on_tx_failed(self, job_id, label, error):
+        if job_id == 0 and self.sender() is self.tx_queue:
+            # The queue could not start; writes warn until the next connect
+            self.tx_queue = None
+        log = self.tx_logs.pop(job_id, self.update_log)
+        log.append(f"✗ Failed {label}: {error}")
+        self.statusBar().showMessage(f"Failed {label}")
     
     def clear_add_form(self):
         """Clear add delivery form"""
@@ -687,17 +973,27 @@ class SupplyChainDashboard(QMainWindow):
                 import shutil
                 if os.path.exists('ganache_db'):
                     shutil.rmtree('ganache_db')
-                if os.path.exists('contract_address.txt'):
-                    os.remove('contract_address.txt')
+                for address_file in ('contract_address.txt', 'packed_contract_address.txt'):
+                    if os.path.exists(address_file):
+                        os.remove(address_file)
                 
                 # Start Ganache
                 subprocess.Popen(['./start_ganache.sh'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 time.sleep(3)
                 
                 # Reconnect (will auto-deploy new contract)
+                self.sync_timer.stop()
+                self.cancel_loader()
+                if self.tx_queue:
+                    self.tx_queue.stop()
+                    self.tx_queue = None
                 self.bc = None
+                self.snapshot.clear()
+                self.prediction_cache.clear()
+                self.mirror.reset(None)
                 self.connect_blockchain()
-                self.delivery_table.setRowCount(0)
+                self.delivery_model.clear()
+                self.live_map.clear()
                 QMessageBox.information(self, "Success", "Blockchain wiped and new contract deployed!")
                     
             except Exception as e:
@@ -762,10 +1058,36 @@ class SupplyChainDashboard(QMainWindow):
         batch_group = QGroupBox("Calculate Risk for All Loaded Deliveries")
         batch_layout = QVBoxLayout()
         
-        calc_all_btn = QPushButton("Calculate Delay Risk for All")
-        calc_all_btn.clicked.connect(self.calculate_all_delay_risks)
-        calc_all_btn.setStyleSheet("background-color: #2196F3; color: white; padding: 15px; font-size: 14px;")
-        batch_layout.addWidget(calc_all_btn)
+        workers_layout = QHBoxLayout()
+        workers_layout.addWidget(QLabel("Parallel workers:"))
+        self.ml_workers = QSpinBox()
+        self.ml_workers.setRange(1, 64)
+        self.ml_workers.setValue(DEFAULT_WORKERS)
+        if ML_BACKEND == 'julia-server':
+            # PredictionScheduler runs this backend on one thread
+            self.ml_workers.setValue(1)
+            self.ml_workers.setEnabled(False)
+            self.ml_workers.setToolTip("The julia-server backend scores on a single Julia process")
+        workers_layout.addWidget(self.ml_workers)
+        workers_layout.addStretch()
+        batch_layout.addLayout(workers_layout)
+        
+        buttons_layout = QHBoxLayout()
+        self.ml_calc_all_btn = QPushButton("Calculate Delay Risk for All")
+        self.ml_calc_all_btn.clicked.connect(self.calculate_all_delay_risks)
+        self.ml_calc_all_btn.setStyleSheet("background-color: #2196F3; color: white; padding: 15px; font-size: 14px;")
+        buttons_layout.addWidget(self.ml_calc_all_btn)
+        
+        self.ml_cancel_btn = QPushButton("Cancel")
+        self.ml_cancel_btn.clicked.connect(self.cancel_delay_risks)
+        self.ml_cancel_btn.setStyleSheet("padding: 15px; font-size: 14px;")
+        self.ml_cancel_btn.setEnabled(False)
+        buttons_layout.addWidget(self.ml_cancel_btn)
+        batch_layout.addLayout(buttons_layout)
+        
+        self.ml_progress = QProgressBar()
+        self.ml_progress.hide()
+        batch_layout.addWidget(self.ml_progress)
         
         self.ml_status = QLabel("Status: Ready")
         self.ml_status.setAlignment(Qt.AlignCenter)
@@ -780,8 +1102,6 @@ class SupplyChainDashboard(QMainWindow):
     
     def calculate_single_delay_risk(self):
         """Calculate delay risk for a single delivery"""
-        from PySide6.QtGui import QColor
-        
         delivery_id = self.ml_single_id.text().strip()
         if not delivery_id:
             QMessageBox.warning(self, "Input Error", "Please enter a Delivery ID")
@@ -803,16 +1123,12 @@ class SupplyChainDashboard(QMainWindow):
             traffic_risk = int(self.ml_traffic.currentText())
             
             # Save risk factors
-            risk_data = self.load_risk_data()
-            risk_data[delivery_id] = {'weather': weather_risk, 'traffic': traffic_risk}
-            self.save_risk_data(risk_data)
+            self.risk_store.set(delivery_id, weather_risk, traffic_risk)
+            self.prediction_cache.invalidate(delivery_id)
             
-            # If already delivered, risk is 0
-            if delivery['status'] == 'Delivered':
-                delay_prob = 0.0
-            else:
-                # Predict
-                delay_prob = predict_delay(delivery, weather_risk, traffic_risk)
+            # Delivered ones score 0; the version is the one that produced the score
+            scores, model_version = predict_delay_batch([delivery], {delivery_id: (weather_risk, traffic_risk)})
+            delay_prob = scores[0]
             
             if delay_prob is not None:
                 # Determine risk level and color
@@ -827,21 +1143,11 @@ class SupplyChainDashboard(QMainWindow):
                     color = "background-color: #f44336; color: white;"
                 
                 self.ml_single_result.setText(f"Delay Probability: {delay_prob:.1f}% - {risk_level}")
+                self.ml_single_result.setToolTip(f"Model {model_version}")
                 self.ml_single_result.setStyleSheet(f"font-size: 18px; font-weight: bold; padding: 15px; border-radius: 5px; {color}")
                 
                 # Update table if delivery is loaded
-                for row in range(self.delivery_table.rowCount()):
-                    item = self.delivery_table.item(row, 0)
-                    if item and item.text() == delivery_id:
-                        risk_item = QTableWidgetItem(f"{delay_prob:.1f}%")
-                        if delay_prob < 30:
-                            risk_item.setBackground(QColor(0, 100, 0))
-                        elif delay_prob < 60:
-                            risk_item.setBackground(QColor(255, 140, 0))
-                        else:
-                            risk_item.setBackground(QColor(220, 20, 60))
-                        self.delivery_table.setItem(row, 1, risk_item)
-                        break
+                self.delivery_model.set_risks([(delivery_id, delay_prob, model_version)])
                 
                 QMessageBox.information(self, "Success", 
                     f"Delay risk calculated: {delay_prob:.1f}%\nRisk factors saved for {delivery_id}")
@@ -854,59 +1160,59 @@ class SupplyChainDashboard(QMainWindow):
             QMessageBox.warning(self, "Error", f"Failed to calculate risk:\n{str(e)}")
     
     def calculate_all_delay_risks(self):
-        """Calculate delay risk for all deliveries in table"""
-        from PySide6.QtGui import QColor
-        
-        if not self.bc:
-            QMessageBox.warning(self, "Connection Error", "Not connected to blockchain")
+        """Calculate delay risk for all deliveries in table on a background worker pool"""
+        if self.prediction_scheduler and self.prediction_scheduler.isRunning():
             return
         
-        self.ml_status.setText("Status: Calculating predictions...")
-        
-        success_count = 0
-        fail_count = 0
+        # Score what the table already shows instead of re-reading the chain
+        deliveries = list(self.delivery_model.deliveries)
         
-        # Process each row in the table
-        for row in range(self.delivery_table.rowCount()):
-            delivery_id_item = self.delivery_table.item(row, 0)
-            if not delivery_id_item:
-                continue
-            
-            delivery_id = delivery_id_item.text()
-            
-            try:
-                # Get delivery data
-                delivery = self.bc.get_delivery(delivery_id)
-                weather_risk, traffic_risk = self.get_risk_values(delivery_id)
-                
-                # If already delivered, risk is 0
-                if delivery['status'] == 'Delivered':
-                    delay_prob = 0.0
-                else:
-                    # Predict
-                    delay_prob = predict_delay(delivery, weather_risk, traffic_risk)
-                
-                if delay_prob is not None:
-                    # Update table
-                    risk_item = QTableWidgetItem(f"{delay_prob:.1f}%")
-                    if delay_prob < 30:
-                        risk_item.setBackground(QColor(0, 100, 0))
-                    elif delay_prob < 60:
-                        risk_item.setBackground(QColor(255, 140, 0))
-                    else:
-                        risk_item.setBackground(QColor(220, 20, 60))
-                    
-                    self.delivery_table.setItem(row, 1, risk_item)
-                    success_count += 1
-                else:
-                    self.delivery_table.setItem(row, 1, QTableWidgetItem("Error"))
-                    fail_count += 1
-            except Exception as e:
-                self.delivery_table.setItem(row, 1, QTableWidgetItem("Error"))
-                fail_count += 1
-        
-        self.ml_status.setText(f"Status: Complete - {success_count} successful, {fail_count} failed")
+        if not deliveries:
+            QMessageBox.warning(self, "No Deliveries", "Load deliveries before calculating delay risk")
+            return
         
+        # Freeze risk factors for the whole run
+        risks = self.risk_store.snapshot()
+        self.prediction_hits_before = self.prediction_cache.hits
+        
+        self.prediction_scheduler = PredictionScheduler(
+            deliveries, risks, self.prediction_cache, workers=self.ml_workers.value(), parent=self)
+        self.prediction_scheduler.scored.connect(self.on_predictions_scored)
+        self.prediction_scheduler.progress.connect(self.on_prediction_progress)
+        self.prediction_scheduler.done.connect(self.on_predictions_done)
+        
+        self.ml_progress.setRange(0, len(deliveries))
+        self.ml_progress.setValue(0)
+        self.ml_progress.show()
+        self.ml_calc_all_btn.setEnabled(False)
+        self.ml_cancel_btn.setEnabled(True)
+        self.ml_status.setText(f"Status: Calculating predictions... 0/{len(deliveries)}")
+        self.prediction_scheduler.start()
+    
+    def cancel_delay_risks(self):
+        """Stop the running Calculate All after its in-flight jobs"""
+        if self.prediction_scheduler and self.prediction_scheduler.isRunning():
+            self.prediction_scheduler.cancel()
+            self.ml_status.setText("Status: Cancelling...")
+    
+    def on_predictions_scored(self, results):
+        """Show a batch of scheduler results in the Delay Risk column"""
+        self.delivery_model.set_risks(results)
+    
+    def on_prediction_progress(self, done, total):
+        self.ml_progress.setValue(done)
+        self.ml_status.setText(f"Status: Calculating predictions... {done}/{total}")
+    
+    def on_predictions_done(self, success_count, fail_count, cancelled):
+        self.ml_progress.hide()
+        self.ml_calc_all_btn.setEnabled(True)
+        self.ml_cancel_btn.setEnabled(False)
+        
+        cached = self.prediction_cache.hits - self.prediction_hits_before
+        if cancelled:
+            self.ml_status.setText(f"Status: Cancelled - {success_count} successful ({cached} cached), {fail_count} failed")
+            return
+        self.ml_status.setText(f"Status: Complete - {success_count} successful ({cached} cached), {fail_count} failed")
         if success_count > 0:
             QMessageBox.information(self, "Predictions Complete", 
                 f"Calculated delay risk for {success_count} deliveries.\nCheck the View Deliveries tab to see results.")
@@ -946,11 +1252,24 @@ class SupplyChainDashboard(QMainWindow):
         self.filter_preparing.setChecked(True)
         filter_layout.addWidget(self.filter_preparing)
         
+        for checkbox in (self.filter_in_transit, self.filter_delivered, self.filter_delayed, self.filter_preparing):
+            checkbox.toggled.connect(self.on_map_filter_changed)
+        
         controls_layout.addLayout(filter_layout)
         
+        mode_layout = QHBoxLayout()
+        mode_layout.addWidget(QLabel("Map Mode:"))
+        self.map_mode = QComboBox()
+        self.map_mode.addItems([MAP_MODE_CLUSTERED, MAP_MODE_DETAILED])
+        self.map_mode.setToolTip("Clustered keeps large fleets responsive; Detailed draws every route up front")
+        mode_layout.addWidget(self.map_mode)
+        mode_layout.addStretch()
+        controls_layout.addLayout(mode_layout)
+        
         gen_btn = QPushButton("Generate Interactive Map")
+        gen_btn.setToolTip("Export the map to supply_chain_map.html and open it in a browser")
         gen_btn.clicked.connect(self.generate_and_open_map)
-        gen_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 20px; font-size: 18px; font-weight: bold; margin-top: 10px;")
+        gen_btn.setStyleSheet("background-color: #4CAF50; color: white; padding: 10px; font-size: 14px; font-weight: bold; margin-top: 10px;")
         controls_layout.addWidget(gen_btn)
         
         self.map_status = QLabel("Map: Not generated")
@@ -961,129 +1280,55 @@ class SupplyChainDashboard(QMainWindow):
         controls.setLayout(controls_layout)
         layout.addWidget(controls)
         
-        layout.addStretch()
+        # Embedded map, loaded once and kept current by show_snapshot/apply_changes
+        self.live_map = LiveMapView()
+        self.live_map.set_visible_statuses(self.selected_map_statuses())
+        layout.addWidget(self.live_map, 1)
         widget.setLayout(layout)
         return widget
     
+    def selected_map_statuses(self):
+        """Statuses ticked in the Map tab filters"""
+        show_statuses = []
+        if self.filter_in_transit.isChecked():
+            show_statuses.append('In Transit')
+        if self.filter_delivered.isChecked():
+            show_statuses.append('Delivered')
+        if self.filter_delayed.isChecked():
+            show_statuses.append('Delayed')
+        if self.filter_preparing.isChecked():
+            show_statuses.append('Preparing for Shipment')
+        return show_statuses
+    
+    def on_map_filter_changed(self):
+        self.live_map.set_visible_statuses(self.selected_map_statuses())
+    
     def generate_and_open_map(self):
         """Refresh the map with current delivery locations"""
         if not self.bc:
             QMessageBox.warning(self, "Connection Error", "Not connected to blockchain")
             return
         
+        if self.loading or not len(self.snapshot):
+            # Read the registry in the background; on_loader_done opens the map
+            self.map_after_load = True
+            self.map_status.setText("Map: waiting for deliveries to load...")
+            if not self.loading:
+                self.start_loader()
+            return
+        self.open_map()
+    
+    def open_map(self):
+        """Write the map for the snapshot's deliveries and open it in a browser"""
+        show_statuses = self.selected_map_statuses()
+        
         try:
-            # Create map centered on US
-            m = folium.Map(location=[39.8283, -98.5795], zoom_start=4)
-            
-            # Get selected filters
-            show_statuses = []
-            if self.filter_in_transit.isChecked():
-                show_statuses.append('In Transit')
-            if self.filter_delivered.isChecked():
-                show_statuses.append('Delivered')
-            if self.filter_delayed.isChecked():
-                show_statuses.append('Delayed')
-            if self.filter_preparing.isChecked():
-                show_statuses.append('Preparing for Shipment')
-            
-            # Load deliveries and add markers
-            delivery_count = 0
-            for i in range(1, 101):  # Try first 100 deliveries
-                delivery_id = f'D{i:04d}'
-                try:
-                    delivery = self.bc.get_delivery(delivery_id)
-                    
-                    # Filter by selected statuses
-                    if delivery['status'] not in show_statuses:
-                        continue
-                    
-                    # Color based on status
-                    color_map = {
-                        'In Transit': '#00008B',
-                        'Delivered': '#006400',
-                        'Delayed': '#DC143C',
-                        'Preparing for Shipment': '#FF8C00'
-                    }
-                    hex_color = color_map.get(delivery['status'], 'gray')
-                    
-                    # Origin marker (small circle)
-                    folium.CircleMarker(
-                        location=[delivery['origin_lat'], delivery['origin_lon']],
-                        radius=5,
-                        popup=f"<b>Origin</b><br>{delivery['id']}",
-                        color='gray',
-                        fill=True,
-                        fillColor='white',
-                        fillOpacity=0.8
-                    ).add_to(m)
-                    
-                    # Destination marker (star)
-                    folium.Marker(
-                        location=[delivery['dest_lat'], delivery['dest_lon']],
-                        popup=f"<b>Destination</b><br>{delivery['id']}",
-                        icon=folium.Icon(color='black', icon='star', prefix='fa')
-                    ).add_to(m)
-                    
-                    # Calculate distance to destination (Haversine formula)
-                    import math
-                    lat1, lon1 = math.radians(delivery['current_lat']), math.radians(delivery['current_lon'])
-                    lat2, lon2 = math.radians(delivery['dest_lat']), math.radians(delivery['dest_lon'])
-                    dlat = lat2 - lat1
-                    dlon = lon2 - lon1
-                    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-                    c = 2 * math.asin(math.sqrt(a))
-                    distance_km = 6371 * c  # Earth radius in km
-                    distance_miles = distance_km * 0.621371
-                    
-                    # Current location marker (truck) with custom color
-                    folium.Marker(
-                        location=[delivery['current_lat'], delivery['current_lon']],
-                        popup=f"""<b>{delivery['id']}</b><br>
-                                  Status: {delivery['status']}<br>
-                                  Current: ({delivery['current_lat']:.2f}, {delivery['current_lon']:.2f})<br>
-                                  Destination: ({delivery['dest_lat']:.2f}, {delivery['dest_lon']:.2f})<br>
-                                  <b>Distance to Destination: {distance_miles:.1f} miles ({distance_km:.1f} km)</b>""",
-                        tooltip=f"{delivery['id']}: {distance_miles:.0f} mi remaining",
-                        icon=folium.DivIcon(html=f'<div style="font-size: 24px; color: {hex_color};"><i class="fa fa-truck"></i></div>')
-                    ).add_to(m)
-                    
-                    # Draw route: origin -> current -> destination
-                    folium.PolyLine(
-                        locations=[
-                            [delivery['origin_lat'], delivery['origin_lon']],
-                            [delivery['current_lat'], delivery['current_lon']],
-                            [delivery['dest_lat'], delivery['dest_lon']]
-                        ],
-                        color=hex_color,
-                        weight=2,
-                        opacity=0.6,
-                        dash_array='5, 10'
-                    ).add_to(m)
-                    
-                    delivery_count += 1
-                except:
-                    pass
-            
-            # Add legend
-            legend_html = '''
-            <div style="position: fixed; 
-                        bottom: 50px; right: 50px; width: 220px; height: 200px; 
-                        background-color: white; border:2px solid grey; z-index:9999; 
-                        font-size:13px; padding: 10px">
-            <p><b>Map Legend</b></p>
-            <p><i class="fa fa-circle" style="color:gray"></i> Origin</p>
-            <p><i class="fa fa-star" style="color:black"></i> Destination</p>
-            <p><i class="fa fa-truck" style="color:#00008B"></i> In Transit</p>
-            <p><i class="fa fa-truck" style="color:#006400"></i> Delivered</p>
-            <p><i class="fa fa-truck" style="color:#DC143C"></i> Delayed</p>
-            <p><i class="fa fa-truck" style="color:#FF8C00"></i> Preparing</p>
-            </div>
-            '''
-            m.get_root().html.add_child(folium.Element(legend_html))
-            
-            # Save to file and open in browser
             map_file = 'supply_chain_map.html'
-            m.save(map_file)
+            if self.map_mode.currentText() == MAP_MODE_CLUSTERED:
+                # The snapshot is kept current by contract events, so no chain reads here
+                delivery_count = write_clustered_map(self.snapshot.values(), show_statuses, map_file)
+            else:
+                delivery_count = self.write_detailed_map(show_statuses, map_file)
             
             # Open in default browser
             webbrowser.open('file://' + os.path.abspath(map_file))
@@ -1097,66 +1342,142 @@ class SupplyChainDashboard(QMainWindow):
             self.map_status.setText(f"Error: {str(e)}")
             QMessageBox.warning(self, "Map Error", f"Failed to generate map:\n{str(e)}")
     
-    def update_delivery_count(self):
-        """Update delivery count badge"""
-        if not self.bc:
-            return
+    def write_detailed_map(self, show_statuses, map_file):
+        """Folium map with origin, destination, truck and route drawn for every delivery"""
+        import folium
         
-        count = 0
-        empty_count = 0
-        i = 1
+        # Create map centered on US
+        m = folium.Map(location=[39.8283, -98.5795], zoom_start=4)
         
-        while empty_count < 50 and i < 10000:
+        delivery_count = 0
+        for delivery in self.snapshot.values():
             try:
-                delivery = self.bc.get_delivery(f'D{i:04d}')
-                if delivery['id']:
-                    count += 1
-                    empty_count = 0
-                else:
-                    empty_count += 1
+                if not delivery['id']:
+                    continue
+                
+                # Filter by selected statuses
+                if delivery['status'] not in show_statuses:
+                    continue
+                
+                # Color based on status
+                hex_color = STATUS_COLORS.get(delivery['status'], 'gray')
+                
+                # Origin marker (small circle)
+                folium.CircleMarker(
+                    location=[delivery['origin_lat'], delivery['origin_lon']],
+                    radius=5,
+                    popup=f"<b>Origin</b><br>{delivery['id']}",
+                    color='gray',
+                    fill=True,
+                    fillColor='white',
+                    fillOpacity=0.8
+                ).add_to(m)
+                
+                # Destination marker (star)
+                folium.Marker(
+                    location=[delivery['dest_lat'], delivery['dest_lon']],
+                    popup=f"<b>Destination</b><br>{delivery['id']}",
+                    icon=folium.Icon(color='black', icon='star', prefix='fa')
+                ).add_to(m)
+                
+                # Calculate distance to destination (Haversine formula)
+                lat1, lon1 = math.radians(delivery['current_lat']), math.radians(delivery['current_lon'])
+                lat2, lon2 = math.radians(delivery['dest_lat']), math.radians(delivery['dest_lon'])
+                dlat = lat2 - lat1
+                dlon = lon2 - lon1
+                a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+                c = 2 * math.asin(math.sqrt(a))
+                distance_km = 6371 * c  # Earth radius in km
+                distance_miles = distance_km * 0.621371
+                
+                # Current location marker (truck) with custom color
+                folium.Marker(
+                    location=[delivery['current_lat'], delivery['current_lon']],
+                    popup=f"""<b>{delivery['id']}</b><br>
+                              Status: {delivery['status']}<br>
+                              Current: ({delivery['current_lat']:.2f}, {delivery['current_lon']:.2f})<br>
+                              Destination: ({delivery['dest_lat']:.2f}, {delivery['dest_lon']:.2f})<br>
+                              <b>Distance to Destination: {distance_miles:.1f} miles ({distance_km:.1f} km)</b>""",
+                    tooltip=f"{delivery['id']}: {distance_miles:.0f} mi remaining",
+                    icon=folium.DivIcon(html=f'<div style="font-size: 24px; color: {hex_color};"><i class="fa fa-truck"></i></div>')
+                ).add_to(m)
+                
+                # Draw route: origin -> current -> destination
+                folium.PolyLine(
+                    locations=[
+                        [delivery['origin_lat'], delivery['origin_lon']],
+                        [delivery['current_lat'], delivery['current_lon']],
+                        [delivery['dest_lat'], delivery['dest_lon']]
+                    ],
+                    color=hex_color,
+                    weight=2,
+                    opacity=0.6,
+                    dash_array='5, 10'
+                ).add_to(m)
+                
+                delivery_count += 1
             except:
-                empty_count += 1
-            i += 1
+                pass
         
-        self.delivery_count_badge.setText(f"📦 Deliveries: {count}")
+        # Add legend
+        legend_html = '''
+        <div style="position: fixed; 
+                    bottom: 50px; right: 50px; width: 220px; height: 200px; 
+                    background-color: white; border:2px solid grey; z-index:9999; 
+                    font-size:13px; padding: 10px">
+        <p><b>Map Legend</b></p>
+        <p><i class="fa fa-circle" style="color:gray"></i> Origin</p>
+        <p><i class="fa fa-star" style="color:black"></i> Destination</p>
+        <p><i class="fa fa-truck" style="color:#00008B"></i> In Transit</p>
+        <p><i class="fa fa-truck" style="color:#006400"></i> Delivered</p>
+        <p><i class="fa fa-truck" style="color:#DC143C"></i> Delayed</p>
+        <p><i class="fa fa-truck" style="color:#FF8C00"></i> Preparing</p>
+        </div>
+        '''
+        m.get_root().html.add_child(folium.Element(legend_html))
+        
+        # Save to file
+        m.save(map_file)
+        return delivery_count
+    
+    def update_delivery_count(self):
+        """Update delivery count badge"""
+        self.delivery_count_badge.setText(f"📦 Deliveries: {len(self.snapshot)}")
+    
+    def init_charts(self):
+        """Import matplotlib and create the chart canvases"""
+        import matplotlib
+        matplotlib.use('Qt5Agg')
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        
+        self.pie_figure = Figure(figsize=(4, 3))
+        self.pie_canvas = FigureCanvas(self.pie_figure)
+        self.pie_layout.addWidget(self.pie_canvas)
+        
+        self.bar_figure = Figure(figsize=(4, 3))
+        self.bar_canvas = FigureCanvas(self.bar_figure)
+        self.bar_layout.addWidget(self.bar_canvas)
+        
+        self.update_charts()
     
     def update_charts(self):
-        """Update both pie chart and bar chart"""
+        """Schedule a chart refresh; bursts of updates share one redraw"""
+        if not self.chart_timer.isActive():
+            self.chart_timer.start()
+    
+    def render_charts(self):
+        """Redraw only the charts whose aggregates changed since the last draw"""
         self.update_pie_chart()
         self.update_bar_chart()
         self.update_avg_delivery_time()
     
     def update_avg_delivery_time(self):
         """Calculate and display average delivery time"""
-        if not self.bc:
-            return
-        
         try:
-            import time as time_module
-            total_time = 0
-            count = 0
-            
-            empty_count = 0
-            i = 1
-            while empty_count < 50 and i < 10000:
-                delivery_id = f'D{i:04d}'
-                try:
-                    delivery = self.bc.get_delivery(delivery_id)
-                    if not delivery['id']:
-                        empty_count += 1
-                        i += 1
-                        continue
-                    empty_count = 0
-                    if delivery['status'] == 'Delivered' and delivery['actual_delivery_date'] > 0:
-                        delivery_time = delivery['actual_delivery_date'] - delivery['timestamp']
-                        total_time += delivery_time
-                        count += 1
-                except:
-                    empty_count += 1
-                i += 1
+            avg_seconds = self.snapshot.average_delivery_time()
             
-            if count > 0:
-                avg_seconds = total_time / count
+            if avg_seconds is not None:
                 avg_hours = avg_seconds / 3600
                 avg_days = avg_hours / 24
                 
@@ -1169,127 +1490,101 @@ class SupplyChainDashboard(QMainWindow):
         except Exception as e:
             print(f"Error calculating avg delivery time: {e}")
     
+    def create_pie_artists(self):
+        """Build the pie once with a wedge, label and percentage per status"""
+        ax = self.pie_figure.add_subplot(111)
+        statuses = list(STATUS_COLORS)
+        wedges, labels, pcts = ax.pie([1] * len(statuses), labels=[''] * len(statuses),
+                                      colors=[STATUS_COLORS[s] for s in statuses],
+                                      autopct='%1.1f%%', startangle=90,
+                                      textprops={'fontsize': 7, 'color': 'white'}, pctdistance=0.85, labeldistance=1.05)
+        ax.axis('equal')
+        empty = ax.text(0.5, 0.5, 'No data', ha='center', va='center', transform=ax.transAxes, color='white')
+        self.pie_figure.patch.set_facecolor('#1e1e1e')
+        ax.set_facecolor('#1e1e1e')
+        self.pie_figure.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.05)
+        self.pie_artists = (statuses, wedges, labels, pcts, empty)
+    
     def update_pie_chart(self):
         """Update pie chart with delivery status distribution"""
-        if not self.bc:
+        if self.pie_figure is None:
             return
         
         try:
-            status_counts = {'In Transit': 0, 'Delivered': 0, 'Delayed': 0, 'Preparing for Shipment': 0}
-            
-            empty_count = 0
-            i = 1
-            while empty_count < 50 and i < 10000:
-                delivery_id = f'D{i:04d}'
-                try:
-                    delivery = self.bc.get_delivery(delivery_id)
-                    if not delivery['id']:
-                        empty_count += 1
-                        i += 1
-                        continue
-                    empty_count = 0
-                    if delivery['status'] in status_counts:
-                        status_counts[delivery['status']] += 1
-                except:
-                    empty_count += 1
-                i += 1
-            
-            self.pie_figure.clear()
-            ax = self.pie_figure.add_subplot(111)
-            
-            labels = []
-            sizes = []
-            colors = []
-            color_map = {'In Transit': '#00008B', 'Delivered': '#006400', 'Delayed': '#DC143C', 'Preparing for Shipment': '#FF8C00'}
+            status_counts = self.snapshot.status_counts()
+            if status_counts == self.drawn_status_counts:
+                return
+            if self.pie_artists is None:
+                self.create_pie_artists()
             
-            for status, count in status_counts.items():
-                if count > 0:
-                    labels.append(f"{status}\n({count})")
-                    sizes.append(count)
-                    colors.append(color_map[status])
+            statuses, wedges, labels, pcts, empty = self.pie_artists
+            total = sum(status_counts.values())
+            empty.set_visible(total == 0)
             
-            if sizes:
-                ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90, 
-                      textprops={'fontsize': 7, 'color': 'white'}, pctdistance=0.85, labeldistance=1.05)
-                ax.axis('equal')
-            else:
-                ax.text(0.5, 0.5, 'No data', ha='center', va='center', transform=ax.transAxes, color='white')
+            # Same geometry ax.pie uses: counter-clockwise from 90 degrees
+            theta = 90.0
+            for status, wedge, label, pct in zip(statuses, wedges, labels, pcts):
+                count = status_counts[status]
+                sweep = 360.0 * count / total if total else 0.0
+                wedge.set_theta1(theta)
+                wedge.set_theta2(theta + sweep)
+                mid = math.radians(theta + sweep / 2)
+                label.set_position((1.05 * math.cos(mid), 1.05 * math.sin(mid)))
+                label.set_horizontalalignment('left' if math.cos(mid) > 0 else 'right')
+                label.set_text(f"{status}\n({count})")
+                pct.set_position((0.85 * math.cos(mid), 0.85 * math.sin(mid)))
+                pct.set_text(f"{sweep / 3.6:.1f}%")
+                for artist in (wedge, label, pct):
+                    artist.set_visible(count > 0)
+                theta += sweep
             
-            self.pie_figure.patch.set_facecolor('#1e1e1e')
-            ax.set_facecolor('#1e1e1e')
-            self.pie_figure.subplots_adjust(left=0.05, right=0.95, top=0.95, bottom=0.05)
-            self.pie_canvas.draw()
+            self.drawn_status_counts = status_counts
+            self.pie_canvas.draw_idle()
         except Exception as e:
             print(f"Error updating pie chart: {e}")
     
+    def create_bar_artists(self):
+        """Build the on-time bars, their count labels and the axis styling once"""
+        ax = self.bar_figure.add_subplot(111)
+        categories = ['On-Time', 'Late', 'At Risk', 'On Track']
+        bars = ax.barh(categories, [0] * len(categories), color=['#006400', '#DC143C', '#FF8C00', '#00008B'])
+        texts = [ax.text(0, bar.get_y() + bar.get_height()/2, '', va='center', fontsize=9, fontweight='bold', color='white')
+                 for bar in bars]
+        empty = ax.text(0.5, 0.5, 'No data', ha='center', va='center', transform=ax.transAxes, color='white')
+        ax.set_xlabel('Deliveries', fontsize=9, color='white')
+        ax.tick_params(axis='both', labelsize=8, colors='white')
+        ax.grid(True, alpha=0.3, axis='x', color='white')
+        for spine in ax.spines.values():
+            spine.set_color('white')
+        self.bar_figure.patch.set_facecolor('#1e1e1e')
+        ax.set_facecolor('#1e1e1e')
+        self.bar_figure.tight_layout()
+        self.bar_artists = (ax, categories, bars, texts, empty)
+    
     def update_bar_chart(self):
         """Update bar chart with on-time performance"""
-        if not self.bc:
+        if self.bar_figure is None:
             return
         
         try:
-            import time as time_module
-            current_time = int(time_module.time())
-            
-            performance = {'On-Time': 0, 'Late': 0, 'At Risk': 0, 'On Track': 0}
-            
-            empty_count = 0
-            i = 1
-            while empty_count < 50 and i < 10000:
-                delivery_id = f'D{i:04d}'
-                try:
-                    delivery = self.bc.get_delivery(delivery_id)
-                    if not delivery['id']:
-                        empty_count += 1
-                        i += 1
-                        continue
-                    empty_count = 0
-                    
-                    expected = delivery['expected_delivery_date']
-                    actual = delivery['actual_delivery_date']
-                    
-                    if delivery['status'] == 'Delivered':
-                        if actual > 0 and actual <= expected:
-                            performance['On-Time'] += 1
-                        else:
-                            performance['Late'] += 1
-                    else:
-                        if current_time > expected:
-                            performance['At Risk'] += 1
-                        else:
-                            performance['On Track'] += 1
-                except:
-                    empty_count += 1
-                i += 1
-            
-            self.bar_figure.clear()
-            ax = self.bar_figure.add_subplot(111)
-            
-            categories = list(performance.keys())
-            counts = list(performance.values())
-            colors = ['#006400', '#DC143C', '#FF8C00', '#00008B']
+            performance = self.snapshot.performance_counts()
+            if performance == self.drawn_performance:
+                return
+            if self.bar_artists is None:
+                self.create_bar_artists()
             
-            if sum(counts) > 0:
-                bars = ax.barh(categories, counts, color=colors)
-                ax.set_xlabel('Deliveries', fontsize=9, color='white')
-                ax.tick_params(axis='both', labelsize=8, colors='white')
-                ax.grid(True, alpha=0.3, axis='x', color='white')
-                ax.spines['bottom'].set_color('white')
-                ax.spines['top'].set_color('white')
-                ax.spines['left'].set_color('white')
-                ax.spines['right'].set_color('white')
-                
-                for bar, count in zip(bars, counts):
-                    if count > 0:
-                        ax.text(bar.get_width(), bar.get_y() + bar.get_height()/2, 
-                               f' {count}', va='center', fontsize=9, fontweight='bold', color='white')
-            else:
-                ax.text(0.5, 0.5, 'No data', ha='center', va='center', transform=ax.transAxes, color='white')
+            ax, categories, bars, texts, empty = self.bar_artists
+            counts = [performance[category] for category in categories]
+            empty.set_visible(sum(counts) == 0)
+            for bar, text, count in zip(bars, texts, counts):
+                bar.set_width(count)
+                text.set_x(count)
+                text.set_text(f' {count}' if count > 0 else '')
+            # Leave room for the count labels past the longest bar
+            ax.set_xlim(0, max(max(counts) * 1.15, 1))
             
-            self.bar_figure.patch.set_facecolor('#1e1e1e')
-            ax.set_facecolor('#1e1e1e')
-            self.bar_figure.tight_layout()
-            self.bar_canvas.draw()
+            self.drawn_performance = performance
+            self.bar_canvas.draw_idle()
         except Exception as e:
             print(f"Error updating bar chart: {e}")
     
@@ -1359,10 +1654,10 @@ class SupplyChainDashboard(QMainWindow):
                         QMessageBox.warning(dialog, "Required", "Delay reason is required")
                         return
                 
-                tx = self.bc.update_status(delivery_id, new_status, reason)
-                QMessageBox.information(dialog, "Success", f"Status updated to: {new_status}")
-                self.load_deliveries()
-                dialog.accept()
+                if self.queue_transaction(self.update_log, f"Status {delivery_id} -> {new_status}",
+                                          self.bc.update_status, delivery_id, new_status, reason):
+                    self.update_log.append(f"Queued status {new_status} for {delivery_id}")
+                    dialog.accept()
             except Exception as e:
                 QMessageBox.warning(dialog, "Error", f"Failed to update status:\n{str(e)}")
         
@@ -1370,10 +1665,10 @@ class SupplyChainDashboard(QMainWindow):
             try:
                 lat = float(lat_input.text())
                 lon = float(lon_input.text())
-                tx = self.bc.update_location(delivery_id, lat, lon)
-                QMessageBox.information(dialog, "Success", f"Location updated to: ({lat}, {lon})")
-                self.load_deliveries()
-                dialog.accept()
+                if self.queue_transaction(self.update_log, f"Location {delivery_id} -> ({lat}, {lon})",
+                                          self.bc.update_location, delivery_id, lat, lon):
+                    self.update_log.append(f"Queued location ({lat}, {lon}) for {delivery_id}")
+                    dialog.accept()
             except ValueError:
                 QMessageBox.warning(dialog, "Input Error", "Please enter valid coordinates")
             except Exception as e:
@@ -1386,50 +1681,54 @@ class SupplyChainDashboard(QMainWindow):
         dialog.exec()
     
     def view_delivery_history(self, delivery_id):
-        """View delivery update history"""
+        """View delivery update history, one page at a time"""
         if not self.bc:
             return
         
         try:
-            from PySide6.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QDialogButtonBox
+            from PySide6.QtWidgets import QDialog, QVBoxLayout, QDialogButtonBox, QListWidget
             from datetime import datetime
             
-            status_history = self.bc.get_status_history(delivery_id)
-            location_history = self.bc.get_location_history(delivery_id)
+            def format_time(timestamp):
+                return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S')
+            
+            def format_status(update):
+                text = f"{format_time(update['timestamp'])} - Status changed to: {update['status']}"
+                if update.get('reason'):
+                    text += f"\n    Reason: {update['reason']}"
+                return text
+            
+            def format_location(update):
+                return f"{format_time(update['timestamp'])} - Location: ({update['lat']:.4f}, {update['lon']:.4f})"
+            
+            status_total = self.bc.get_status_history_count(delivery_id)
+            location_total = self.bc.get_location_history_count(delivery_id)
             
             dialog = QDialog(self)
             dialog.setWindowTitle(f"Update History - {delivery_id}")
             dialog.setMinimumSize(500, 400)
             layout = QVBoxLayout()
             
-            history_text = QTextEdit()
-            history_text.setReadOnly(True)
+            layout.addWidget(QLabel(f"<h2>Delivery History: {delivery_id}</h2>"))
             
-            content = f"<h2>Delivery History: {delivery_id}</h2>"
+            layout.addWidget(QLabel(f"<h3>Status Updates ({status_total}):</h3>"))
+            status_list = QListWidget()
+            layout.addWidget(status_list)
+            status_pager = HistoryPager(status_list, status_total,
+                                        lambda start, count: self.bc.get_status_history_range(delivery_id, start, count),
+                                        format_status, "No status updates recorded.")
+            layout.addWidget(status_pager.more_button)
             
-            if status_history:
-                content += "<h3>Status Updates:</h3><ul>"
-                for update in reversed(status_history):
-                    timestamp = datetime.fromtimestamp(update['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-                    content += f"<li><b>{timestamp}</b> - Status changed to: <b>{update['status']}</b>"
-                    if update.get('reason'):
-                        content += f"<br>&nbsp;&nbsp;&nbsp;&nbsp;<i>Reason: {update['reason']}</i>"
-                    content += "</li>"
-                content += "</ul>"
-            else:
-                content += "<p>No status updates recorded.</p>"
-            
-            if location_history:
-                content += "<h3>Location Updates:</h3><ul>"
-                for update in reversed(location_history):
-                    timestamp = datetime.fromtimestamp(update['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-                    content += f"<li><b>{timestamp}</b> - Location: ({update['lat']:.4f}, {update['lon']:.4f})</li>"
-                content += "</ul>"
-            else:
-                content += "<p>No location updates recorded.</p>"
+            layout.addWidget(QLabel(f"<h3>Location Updates ({location_total}):</h3>"))
+            location_list = QListWidget()
+            layout.addWidget(location_list)
+            location_pager = HistoryPager(location_list, location_total,
+                                          lambda start, count: self.bc.get_location_history_range(delivery_id, start, count),
+                                          format_location, "No location updates recorded.")
+            layout.addWidget(location_pager.more_button)
             
-            history_text.setHtml(content)
-            layout.addWidget(history_text)
+            # Keep the pagers alive as long as the dialog
+            dialog.pagers = [status_pager, location_pager]
             
             buttons = QDialogButtonBox(QDialogButtonBox.Close)
             buttons.rejected.connect(dialog.reject)
@@ -1450,8 +1749,8 @@ class SupplyChainDashboard(QMainWindow):
         layout = QVBoxLayout()
         
         checkboxes = []
-        for i in range(self.delivery_table.columnCount()):
-            header = self.delivery_table.horizontalHeaderItem(i).text()
+        for i in range(self.delivery_model.columnCount()):
+            header = self.delivery_model.headerData(i, Qt.Horizontal)
             checkbox = QCheckBox(header)
             checkbox.setChecked(not self.delivery_table.isColumnHidden(i))
             checkbox.col_index = i
@@ -1472,9 +1771,28 @@ class SupplyChainDashboard(QMainWindow):
     
     def closeEvent(self, event):
         """Handle window close"""
+        self.sync_timer.stop()
+        if self.tx_queue:
+            self.tx_queue.stop()
+        if self.connect_worker and not self.connect_worker.wait(CONNECT_WAIT_MS):
+            # Stuck on an RPC call; the app is exiting, so do not hang with it
+            print("Connect worker did not finish, terminating it")
+            self.connect_worker.terminate()
+            self.connect_worker.wait()
+        if self.loader:
+            self.cancel_loader()
+            self.loader.wait()
+        if self.prediction_scheduler:
+            self.prediction_scheduler.cancel()
+            self.prediction_scheduler.wait()
+        self.mirror.close()
+        self.risk_store.close()
+        close_julia_worker()
         event.accept()
 
 def main():
+    # Required by QtWebEngine, which the Live Map tab loads after the application starts
+    QApplication.setAttribute(Qt.AA_ShareOpenGLContexts)
     app = QApplication(sys.argv)
     dashboard = SupplyChainDashboard()
     dashboard.show()
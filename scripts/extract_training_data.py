@@ -0,0 +1,14 @@
+import sys
+import os
+
+# Add parent directory to path to import blockchain_helper
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blockchain_helper import BlockchainManager
+from training_extractor import extract_training_data, DEFAULT_STORE_PATH
+
+
+def main(store_path=DEFAULT_STORE_PATH):
+    """Append samples from newly delivered shipments, e.g. brownie run scripts/extract_training_data.py"""
+    bc = BlockchainManager()
+    print(f"✓ Extracting training data from {bc.contract.address}")
+    extract_training_data(bc, store_path)
@@ -0,0 +1,14 @@
+import sys
+import os
+
+# Add parent directory to path to import blockchain_helper
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from blockchain_helper import BlockchainManager
+from csv_importer import import_csv
+
+
+def main(csv_path='sample_delivery_dataset.csv', restart=False):
+    """Bulk import deliveries, e.g. brownie run scripts/import_csv.py main my_deliveries.csv"""
+    bc = BlockchainManager()
+    print(f"✓ Importing {csv_path} into {bc.contract.address}")
+    import_csv(bc, csv_path, resume=not restart)
@@ -1,9 +1,12 @@
 import sys
+import time
+# Taken before any Qt import so startup timing covers PySide6 as well
+STARTUP_CLOCK = time.perf_counter()
 from PySide6.QtWidgets import QApplication
 from scripts.dashboard import SupplyChainDashboard
 
 def main():
     app = QApplication(sys.argv)
-    dashboard = SupplyChainDashboard()
+    dashboard = SupplyChainDashboard(startup_clock=STARTUP_CLOCK)
     dashboard.show()
     sys.exit(app.exec())
@@ -0,0 +1,33 @@
+import json
+import time
+
+
+class StartupTimer:
+    """Record named startup milestones relative to a perf_counter() start
+
+    Pass the perf_counter() value taken at the top of the entry script,
+    before any Qt import, so the time spent importing PySide6 and friends
+    is included. Interpreter start-up before that line is not measured.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.start))
+
+    def report(self):
+        """Human-readable report, one milestone per line"""
+        lines = ["Startup timing:"]
+        previous = 0.0
+        for name, elapsed in self.marks:
+            lines.append(f"  {name:<24} {elapsed * 1000:8.1f} ms  (+{(elapsed - previous) * 1000:.1f} ms)")
+            previous = elapsed
+        return "\n".join(lines)
+
+    def save(self, path='startup_timing.jsonl'):
+        """Append this run's milestones as one JSON line so regressions can be tracked"""
+        record = {'time': int(time.time()), 'marks': {name: round(elapsed, 4) for name, elapsed in self.marks}}
+        with open(path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
@@ -0,0 +1,33 @@
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'scripts'))
+
+pytest.importorskip('numpy')
+if shutil.which('julia') is None:
+    pytest.skip("julia is not on PATH", allow_module_level=True)
+if subprocess.run(['julia', '-e', 'using JSON, SHA'], capture_output=True).returncode != 0:
+    pytest.skip("Julia packages JSON and SHA are not installed", allow_module_level=True)
+
+from ml_predictor import get_model, predict_delay_julia
+from check_model_parity import TOLERANCE, random_delivery
+
+
+@pytest.mark.parametrize('seed', range(25))
+def test_numpy_matches_julia(seed):
+    rng = random.Random(seed)
+    delivery = random_delivery(rng, time.time())
+    weather, traffic = rng.randint(1, 5), rng.randint(1, 5)
+
+    julia = predict_delay_julia(delivery, weather, traffic)
+    assert julia is not None, "ml_model.jl failed"
+    numpy_score = float(get_model().predict([delivery], weather, traffic)[0])
+    assert abs(julia - numpy_score) <= TOLERANCE
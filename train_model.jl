@@ -1,32 +1,87 @@
 using JSON
+using Random
 using Statistics
 using LinearAlgebra
 
+include("columnar_store.jl")
+
 # Load training data
 function load_training_data()
     data = JSON.parsefile("training_data.json")
     return data
 end
 
+# Normalize one sample into row i of X (each feature scaled to 0-1)
+function sample_features!(X, i, sample)
+    X[i, 1] = (sample["weather_risk"] - 1) / 4
+    X[i, 2] = (sample["traffic_risk"] - 1) / 4
+    X[i, 3] = min(sample["remaining_distance"] / 3000, 1.0)
+    X[i, 4] = sample["time_until_expected"] < 0 ? 1.0 : max(0, 1 - sample["time_until_expected"] / (7 * 24 * 3600))
+    X[i, 5] = sample["percent_complete"] / 100
+end
+
 # Normalize features
 function normalize_features(data)
     X = zeros(length(data), 5)  # 5 features
     y = zeros(length(data))
     
     for (i, sample) in enumerate(data)
-        # Normalize each feature to 0-1
-        X[i, 1] = (sample["weather_risk"] - 1) / 4
-        X[i, 2] = (sample["traffic_risk"] - 1) / 4
-        X[i, 3] = min(sample["remaining_distance"] / 3000, 1.0)
-        X[i, 4] = sample["time_until_expected"] < 0 ? 1.0 : max(0, 1 - sample["time_until_expected"] / (7 * 24 * 3600))
-        X[i, 5] = sample["percent_complete"] / 100
-        
+        sample_features!(X, i, sample)
         y[i] = sample["is_delayed"]
     end
     
     return X, y
 end
 
+const FEATURE_COLUMNS = ["weather_risk", "traffic_risk", "remaining_distance", "time_until_expected", "percent_complete", "is_delayed"]
+
+# Normalize memory-mapped columns into a feature matrix, as sample_features! does per row
+function columnar_features(columns)
+    time_until_expected = Float64.(columns["time_until_expected"])
+    X = zeros(length(time_until_expected), 5)
+    X[:, 1] = (columns["weather_risk"] .- 1) ./ 4
+    X[:, 2] = (columns["traffic_risk"] .- 1) ./ 4
+    X[:, 3] = min.(columns["remaining_distance"] ./ 3000, 1.0)
+    X[:, 4] = ifelse.(time_until_expected .< 0, 1.0, max.(0, 1 .- time_until_expected ./ (7 * 24 * 3600)))
+    X[:, 5] = columns["percent_complete"] ./ 100
+    return X, Float64.(columns["is_delayed"])
+end
+
+# Call f(X, y) on consecutive chunks of samples.
+# A columnar store directory (see columnar_store.jl) is read chunk by chunk
+# through mmap; JSON Lines files (.jsonl, one sample per line) are streamed in
+# chunk_size rows; a plain JSON array is parsed whole and then split.
+# X and y may be reused between calls.
+function foreach_chunk(f, path; chunk_size=100_000)
+    if isdir(path)
+        foreach_columnar_chunk(path; names=FEATURE_COLUMNS) do columns
+            f(columnar_features(columns)...)
+        end
+    elseif endswith(path, ".jsonl")
+        X = zeros(chunk_size, 5)
+        y = zeros(chunk_size)
+        n = 0
+        for line in eachline(path)
+            isempty(strip(line)) && continue
+            sample = JSON.parse(line)
+            n += 1
+            sample_features!(X, n, sample)
+            y[n] = sample["is_delayed"]
+            if n == chunk_size
+                f(X, y)
+                n = 0
+            end
+        end
+        n > 0 && f(view(X, 1:n, :), view(y, 1:n))
+    else
+        X, y = normalize_features(JSON.parsefile(path))
+        for start in 1:chunk_size:size(X, 1)
+            stop = min(start + chunk_size - 1, size(X, 1))
+            f(view(X, start:stop, :), view(y, start:stop))
+        end
+    end
+end
+
 # Sigmoid function
 sigmoid(z) = 1 ./ (1 .+ exp.(-z))
 
@@ -63,6 +118,112 @@ function train_logistic_regression(X, y; learning_rate=0.1, iterations=1000)
     return weights, bias
 end
 
+# Mean binary cross-entropy
+function log_loss(X, y, weights, bias)
+    predictions = sigmoid(X * weights .+ bias)
+    return -mean(y .* log.(predictions .+ 1e-10) .+ (1 .- y) .* log.(1 .- predictions .+ 1e-10))
+end
+
+mutable struct SGDState
+    weights::Vector{Float64}
+    bias::Float64
+    step::Int
+end
+
+# Out-of-core logistic regression: mini-batch SGD over chunks streamed from
+# path, with learning rate learning_rate / (1 + step / decay_steps).
+# Every holdout_every-th sample (by position in the file) is held out; training
+# stops once the holdout loss has not improved by min_improvement for
+# patience epochs. A checkpoint is written after every epoch.
+function train_streaming(path; batch_size=256, chunk_size=100_000, max_epochs=20,
+                         learning_rate=0.5, decay_steps=10_000, holdout_every=20,
+                         max_holdout=200_000, patience=2, min_improvement=1e-4,
+                         checkpoint_path="trained_model.checkpoint.json", resume=false)
+    state = SGDState(zeros(5), 0.0, 0)
+    best_weights, best_bias, best_loss = copy(state.weights), state.bias, Inf
+    stale_epochs = 0
+    first_epoch = 1
+    
+    if resume && isfile(checkpoint_path)
+        checkpoint = JSON.parsefile(checkpoint_path)
+        state = SGDState(Float64.(checkpoint["weights"]), checkpoint["bias"], checkpoint["step"])
+        best_weights, best_bias, best_loss = Float64.(checkpoint["best_weights"]), checkpoint["best_bias"], checkpoint["best_loss"]
+        stale_epochs = checkpoint["stale_epochs"]
+        first_epoch = checkpoint["epoch"] + 1
+        println("Resuming after epoch $(checkpoint["epoch"]) (best holdout loss $(round(best_loss, digits=4)))")
+    end
+    
+    holdout_X = zeros(0, 5)
+    holdout_y = zeros(0)
+    if first_epoch > max_epochs || stale_epochs >= patience
+        # The checkpointed run already finished; nothing to train or evaluate
+        println("Checkpoint $checkpoint_path has no epochs left to run")
+        return best_weights, best_bias, holdout_X, holdout_y
+    end
+    
+    for epoch in first_epoch:max_epochs
+        # The holdout set is rebuilt each pass so a resumed run sees the same rows
+        holdout_X = zeros(0, 5)
+        holdout_y = zeros(0)
+        seen = 0
+        started = time()
+        
+        foreach_chunk(path; chunk_size=chunk_size) do X, y
+            n = size(X, 1)
+            is_holdout = [(seen + i) % holdout_every == 0 for i in 1:n]
+            seen += n
+            
+            held = findall(is_holdout)
+            room = max_holdout - length(holdout_y)
+            if room > 0 && !isempty(held)
+                held = held[1:min(end, room)]
+                holdout_X = vcat(holdout_X, X[held, :])
+                holdout_y = vcat(holdout_y, y[held])
+            end
+            
+            rows = shuffle(findall(.!is_holdout))
+            for start in 1:batch_size:length(rows)
+                batch = rows[start:min(start + batch_size - 1, end)]
+                Xb = X[batch, :]
+                dz = sigmoid(Xb * state.weights .+ state.bias) .- y[batch]
+                lr = learning_rate / (1 + state.step / decay_steps)
+                state.weights .-= lr .* (Xb' * dz) ./ length(batch)
+                state.bias -= lr * sum(dz) / length(batch)
+                state.step += 1
+            end
+        end
+        
+        isempty(holdout_y) && error("need at least $holdout_every samples for a holdout set")
+        loss = log_loss(holdout_X, holdout_y, state.weights, state.bias)
+        println("Epoch $epoch: $seen samples, holdout loss = $(round(loss, digits=4)) ($(round(time() - started, digits=1))s)")
+        
+        if loss < best_loss - min_improvement
+            best_weights, best_bias, best_loss = copy(state.weights), state.bias, loss
+            stale_epochs = 0
+        else
+            stale_epochs += 1
+        end
+        
+        write_json(checkpoint_path, Dict(
+            "epoch" => epoch,
+            "step" => state.step,
+            "weights" => state.weights,
+            "bias" => state.bias,
+            "best_weights" => best_weights,
+            "best_bias" => best_bias,
+            "best_loss" => best_loss,
+            "stale_epochs" => stale_epochs
+        ))
+        
+        if stale_epochs >= patience
+            println("Holdout loss stopped improving, stopping early")
+            break
+        end
+    end
+    
+    return best_weights, best_bias, holdout_X, holdout_y
+end
+
 # Evaluate model
 function evaluate_model(X, y, weights, bias)
     z = X * weights .+ bias
@@ -113,21 +274,70 @@ function main()
     println("  Recall:    $(round(recall * 100, digits=2))%")
     println("  F1 Score:  $(round(f1, digits=3))")
     
-    # Save trained weights
-    model_params = Dict(
+    save_model(weights, bias, accuracy, precision, recall, f1)
+end
+
+# Write JSON through a temporary file so readers never see a partial model
+function write_json(path, data)
+    tmp_path = path * ".tmp"
+    open(tmp_path, "w") do f
+        JSON.print(f, data, 2)
+    end
+    mv(tmp_path, path; force=true)
+end
+
+# Next "vN" after the version in the existing trained_model.json
+function next_model_version(path="trained_model.json")
+    previous = 0
+    if isfile(path)
+        try
+            m = match(r"^v(\d+)$", string(get(JSON.parsefile(path), "version", "v0")))
+            m === nothing || (previous = parse(Int, m.captures[1]))
+        catch
+        end
+    end
+    return "v$(previous + 1)"
+end
+
+function save_model(weights, bias, accuracy, precision, recall, f1)
+    version = next_model_version()
+    write_json("trained_model.json", Dict(
+        "version" => version,
         "weights" => weights,
         "bias" => bias,
         "accuracy" => accuracy,
         "precision" => precision,
         "recall" => recall,
         "f1" => f1
-    )
+    ))
     
-    open("trained_model.json", "w") do f
-        JSON.print(f, model_params, 2)
+    println("\nModel $version saved to trained_model.json")
+end
+
+# Streaming entry point: julia train_model.jl --stream <columnar dir or .jsonl> [--resume]
+function main_streaming(path, resume)
+    println("Streaming training data from $path...")
+    weights, bias, holdout_X, holdout_y = train_streaming(path; resume=resume)
+    if isempty(holdout_y)
+        # Only a finished checkpoint gets here; its model was saved by that run
+        println("Nothing trained, trained_model.json left unchanged (delete the checkpoint to train again)")
+        return
     end
     
-    println("\nModel saved to trained_model.json")
+    println("\nEvaluating model on $(length(holdout_y)) holdout samples...")
+    accuracy, precision, recall, f1 = evaluate_model(holdout_X, holdout_y, weights, bias)
+    
+    println("\nModel Performance:")
+    println("  Accuracy:  $(round(accuracy * 100, digits=2))%")
+    println("  Precision: $(round(precision * 100, digits=2))%")
+    println("  Recall:    $(round(recall * 100, digits=2))%")
+    println("  F1 Score:  $(round(f1, digits=3))")
+    
+    save_model(weights, bias, accuracy, precision, recall, f1)
 end
 
-main()
+if length(ARGS) >= 2 && ARGS[1] == "--stream"
+    main_streaming(ARGS[2], "--resume" in ARGS)
+else
+    main()
+end
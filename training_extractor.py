@@ -0,0 +1,146 @@
+import json
+import math
+import os
+from ml_predictor import haversine_distance
+from risk_store import read_risks
+from training_store import TrainingStore, COLUMNS
+
+DAY = 24 * 60 * 60
+# Updates per *_history_range call
+HISTORY_PAGE = 200
+# generate_training_data.jl --columnar replaces training_data.columnar, so
+# samples taken from the chain live in their own store
+DEFAULT_STORE_PATH = 'training_data.chain.columnar'
+
+
+def load_state(state_path):
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state_path, state):
+    tmp_path = state_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def read_history(fetch_range, page_size=HISTORY_PAGE):
+    """A delivery's whole history through a *_history_range view, one bounded page per call"""
+    history = []
+    while True:
+        page = fetch_range(len(history), page_size)
+        history.extend(page)
+        if len(page) < page_size:
+            return history
+
+
+def delivery_samples(delivery, status_history, location_history, weather_risk=2, traffic_risk=2):
+    """One training sample per status or location update before delivery
+
+    Features are rebuilt from the position known at each update; the label is
+    whether the delivery finally arrived after its expected date.
+    """
+    origin = (delivery['origin_lat'], delivery['origin_lon'])
+    dest = (delivery['dest_lat'], delivery['dest_lon'])
+    start = delivery['timestamp']
+    expected = delivery['expected_delivery_date']
+    actual = delivery['actual_delivery_date']
+    total_distance = haversine_distance(*origin, *dest)
+    is_delayed = 1 if actual > expected else 0
+
+    # Merge both histories into one timeline; location updates carry a position
+    updates = [(u['timestamp'], (u['lat'], u['lon'])) for u in location_history]
+    updates += [(u['timestamp'], None) for u in status_history if u['status'] != 'Delivered']
+    updates.sort(key=lambda u: u[0])
+
+    samples = []
+    position = origin
+    for timestamp, location in updates:
+        if timestamp >= actual:
+            break
+        if location is not None:
+            position = location
+        remaining_distance = haversine_distance(*position, *dest)
+        if total_distance > 0:
+            percent_complete = min(max((total_distance - remaining_distance) / total_distance * 100, 0.0), 100.0)
+        else:
+            percent_complete = 0.0
+        samples.append({
+            'total_distance': total_distance,
+            'remaining_distance': remaining_distance,
+            'percent_complete': percent_complete,
+            'elapsed_days': (timestamp - start) / DAY,
+            'expected_days': (expected - start) / DAY,
+            'time_until_expected': expected - timestamp,
+            'weather_risk': weather_risk,
+            'traffic_risk': traffic_risk,
+            'is_delayed': is_delayed,
+            # Only synthetic samples have a ground-truth score
+            'delay_score': math.nan
+        })
+    return samples
+
+
+def extract_training_data(bc, store_path=DEFAULT_STORE_PATH, state_path='training_extraction.json',
+                          risk_path='risk_data.json', batch_size=100, log=print):
+    """Append samples for deliveries finalised since the last run to the training store
+
+    Only blocks after the one recorded in state_path are scanned, and a
+    delivery is taken from the StatusChanged event that set its actual
+    delivery date, so each delivery is extracted exactly once. The state also
+    records the store's row count; rows appended by a run that crashed before
+    saving its state are dropped before extracting again.
+    Returns the number of samples appended.
+    """
+    state = load_state(state_path)
+    store = TrainingStore(store_path)
+    if state.get('contract') != bc.contract.address:
+        # New contract (e.g. after a wipe): its history starts from scratch
+        state = {'contract': bc.contract.address, 'last_block': -1, 'deliveries': 0, 'samples': 0,
+                 'rows': len(store)}
+    elif len(store) > state.get('rows', len(store)):
+        log(f"Dropping {len(store) - state['rows']} rows appended by an interrupted run")
+        store.truncate(state['rows'])
+
+    events, to_block = bc.get_events(state['last_block'] + 1)
+    finalised = {}
+    for event in events:
+        if event['event'] == 'StatusChanged' and event['status'] == 'Delivered':
+            finalised.setdefault(event['id'], event['timestamp'])
+    log(f"Blocks {state['last_block'] + 1}-{to_block}: {len(finalised)} deliveries marked Delivered")
+
+    # Read-only, so a running dashboard's journal is left alone
+    risks = read_risks(risk_path)
+    rows = {name: [] for name, _ in COLUMNS}
+    delivery_count = 0
+    ids = list(finalised)
+    for start in range(0, len(ids), batch_size):
+        for delivery in bc.get_deliveries(ids[start:start + batch_size]):
+            # Later Delivered events do not move the actual date, so skip them
+            if not delivery['id'] or delivery['actual_delivery_date'] != finalised[delivery['id']]:
+                continue
+            weather_risk, traffic_risk = risks.get(delivery['id'], (2, 2))
+            delivery_id = delivery['id']
+            samples = delivery_samples(
+                delivery,
+                read_history(lambda offset, count: bc.get_status_history_range(delivery_id, offset, count)),
+                read_history(lambda offset, count: bc.get_location_history_range(delivery_id, offset, count)),
+                weather_risk, traffic_risk)
+            for sample in samples:
+                for name in rows:
+                    rows[name].append(sample[name])
+            delivery_count += 1
+
+    sample_count = len(rows['is_delayed'])
+    store.append(rows)
+    state['last_block'] = to_block
+    state['deliveries'] += delivery_count
+    state['samples'] += sample_count
+    state['rows'] = len(store)
+    save_state(state_path, state)
+    log(f"Appended {sample_count} samples from {delivery_count} deliveries to {store_path} ({len(store)} total)")
+    return sample_count
@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import numpy as np
+
+# Same layout as columnar_store.jl: manifest.json plus one raw little-endian
+# file per column per chunk, so chunks can be memory-mapped without parsing
+COLUMNS = [
+    ('total_distance', 'float32'),
+    ('remaining_distance', 'float32'),
+    ('percent_complete', 'float32'),
+    ('elapsed_days', 'float32'),
+    ('expected_days', 'float32'),
+    ('time_until_expected', 'int32'),
+    ('weather_risk', 'int8'),
+    ('traffic_risk', 'int8'),
+    ('is_delayed', 'int8'),
+    ('delay_score', 'float32')
+]
+
+DTYPES = {'float32': '<f4', 'int32': '<i4', 'int8': 'i1'}
+
+
+class TrainingStore:
+    """Columnar training data written by generate_training_data.jl --columnar"""
+
+    def __init__(self, path='training_data.columnar'):
+        self.path = path
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            with open(os.path.join(self.path, 'manifest.json'), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {
+                'format': 'columnar',
+                'version': 1,
+                'byte_order': 'little',
+                'columns': [{'name': name, 'dtype': dtype} for name, dtype in COLUMNS],
+                'chunks': [],
+                'rows': 0
+            }
+
+    def __len__(self):
+        return self.manifest['rows']
+
+    @property
+    def column_names(self):
+        return [column['name'] for column in self.manifest['columns']]
+
+    def iter_chunks(self, names=None):
+        """Yield one {column: read-only memmap} dict per chunk"""
+        for chunk in self.manifest['chunks']:
+            columns = {}
+            for column in self.manifest['columns']:
+                if names is not None and column['name'] not in names:
+                    continue
+                columns[column['name']] = np.memmap(
+                    os.path.join(self.path, chunk['path'], column['name'] + '.bin'),
+                    dtype=DTYPES[column['dtype']], mode='r', shape=(chunk['rows'],))
+            yield columns
+
+    def column(self, name):
+        """One column across all chunks, copied into memory"""
+        chunks = [columns[name] for columns in self.iter_chunks([name])]
+        if not chunks:
+            return np.empty(0, dtype=DTYPES[dict(COLUMNS)[name]])
+        return np.concatenate(chunks)
+
+    def append(self, columns):
+        """Append one chunk from {column: sequence}; every column is required"""
+        rows = len(columns[self.manifest['columns'][0]['name']])
+        if rows == 0:
+            return
+
+        chunk = f"chunk-{len(self.manifest['chunks']):05d}"
+        os.makedirs(os.path.join(self.path, chunk), exist_ok=True)
+        for column in self.manifest['columns']:
+            values = np.asarray(columns[column['name']]).astype(DTYPES[column['dtype']])
+            if len(values) != rows:
+                raise ValueError(f"column {column['name']} has {len(values)} rows, expected {rows}")
+            values.tofile(os.path.join(self.path, chunk, column['name'] + '.bin'))
+
+        # The manifest is written last, so readers never see a partial chunk
+        self.manifest['chunks'].append({'path': chunk, 'rows': rows})
+        self.manifest['rows'] += rows
+        self._save_manifest()
+
+    def truncate(self, rows):
+        """Drop every row after the first `rows`, e.g. ones appended by an interrupted run"""
+        if rows >= self.manifest['rows']:
+            return
+        kept, dropped, total = [], [], 0
+        for chunk in self.manifest['chunks']:
+            if total >= rows:
+                dropped.append(chunk)
+                continue
+            if total + chunk['rows'] > rows:
+                # Column files keep their tail; readers map only chunk['rows'] values
+                chunk = dict(chunk, rows=rows - total)
+            kept.append(chunk)
+            total += chunk['rows']
+        self.manifest['chunks'] = kept
+        self.manifest['rows'] = total
+        self._save_manifest()
+        for chunk in dropped:
+            shutil.rmtree(os.path.join(self.path, chunk['path']), ignore_errors=True)
+
+    def _save_manifest(self):
+        manifest_path = os.path.join(self.path, 'manifest.json')
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
@@ -0,0 +1,113 @@
+import itertools
+import queue
+import time
+from PySide6.QtCore import QThread, Signal
+
+# brownie TransactionReceipt.status values
+TX_REVERTED = 0
+TX_CONFIRMED = 1
+TX_DROPPED = -2
+
+
+class TransactionQueue(QThread):
+    """Background sender that keeps several transactions in flight
+
+    Jobs are BlockchainManager write methods (add_delivery, update_status,
+    update_location). The queue assigns nonces itself, submits without
+    waiting for receipts and reports progress through the signals below.
+    """
+
+    # job_id, label, txid
+    submitted = Signal(int, str, str)
+    # job_id, label, txid
+    confirmed = Signal(int, str, str)
+    # job_id, label, error message (job_id 0: the queue itself could not start)
+    failed = Signal(int, str, str)
+
+    def __init__(self, bc, max_in_flight=8, poll_interval=0.2, parent=None):
+        super().__init__(parent)
+        self.bc = bc
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        self.jobs = queue.Queue()
+        self.in_flight = []
+        self.nonce = None
+        self._job_ids = itertools.count(1)
+        self._running = True
+
+    def enqueue(self, label, method, *args, **kwargs):
+        """Queue a write, e.g. enqueue("Status D0001", bc.update_status, "D0001", "Delayed")"""
+        job_id = next(self._job_ids)
+        self.jobs.put((job_id, label, method, args, kwargs))
+        return job_id
+
+    def pending_count(self):
+        return self.jobs.qsize() + len(self.in_flight)
+
+    def stop(self):
+        """Stop after the current poll; unsent jobs are dropped"""
+        self._running = False
+        self.wait()
+
+    def run(self):
+        try:
+            self.nonce = self.bc.get_pending_nonce()
+        except Exception as e:
+            error = f"Could not read the account nonce: {e}"
+            self.failed.emit(0, "Transaction queue", error)
+            # Nothing will send the jobs already queued, so report them too
+            while True:
+                try:
+                    job_id, label = self.jobs.get_nowait()[:2]
+                except queue.Empty:
+                    return
+                self.failed.emit(job_id, label, error)
+        while self._running:
+            while len(self.in_flight) < self.max_in_flight:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                self._submit(job)
+
+            self._check_in_flight()
+
+            if not self.in_flight:
+                # Nothing to watch, block until new work arrives
+                try:
+                    job = self.jobs.get(timeout=self.poll_interval)
+                except queue.Empty:
+                    continue
+                self._submit(job)
+            else:
+                time.sleep(self.poll_interval)
+
+    def _submit(self, job):
+        job_id, label, method, args, kwargs = job
+        try:
+            tx = method(*args, tx_options={'nonce': self.nonce, 'required_confs': 0}, **kwargs)
+            self.nonce += 1
+            self.in_flight.append((job_id, label, tx))
+            self.submitted.emit(job_id, label, tx.txid)
+        except Exception as e:
+            # The nonce may not have been consumed; resync with the node
+            try:
+                self.nonce = self.bc.get_pending_nonce()
+            except Exception:
+                pass
+            self.failed.emit(job_id, label, str(e))
+
+    def _check_in_flight(self):
+        still_pending = []
+        for job_id, label, tx in self.in_flight:
+            status = int(tx.status)
+            if status == TX_CONFIRMED:
+                self.confirmed.emit(job_id, label, tx.txid)
+            elif status == TX_REVERTED:
+                self.failed.emit(job_id, label, f"Transaction {tx.txid} reverted")
+            elif status == TX_DROPPED:
+                self.failed.emit(job_id, label, f"Transaction {tx.txid} dropped")
+                self.nonce = self.bc.get_pending_nonce()
+            else:
+                still_pending.append((job_id, label, tx))
+        self.in_flight = still_pending